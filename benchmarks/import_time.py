@@ -0,0 +1,179 @@
+"""Cold-start import benchmark for the dashboard pages.
+
+Each page is opened in a fresh interpreter under ``python -X importtime``:
+``app.py`` is run with Streamlit's ``AppTest``, starting at the page, and the
+page's interactions (such as submitting the form) are replayed. Streamlit
+and ``AppTest`` are loaded before the page runs and not counted, so what is
+measured is everything ``app.py`` and the page scripts import, including
+anything new added to them. The cumulative import time is compared with the
+stored baseline. The run fails if a page got slower than the allowed
+tolerance, or if a cold start on the Overview page pulls in one of the heavy
+modules that should only be imported by the pages using them (other than
+what Streamlit loads itself to render the page's custom components).
+
+    python benchmarks/import_time.py            # check against the baseline
+    python benchmarks/import_time.py --update   # record a new baseline
+
+Baselines are machine specific; record one on the hardware you compare on.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "import_baseline.json"
+
+sys.path.insert(0, str(ROOT))
+
+from dashboard import DECISIONS_PAGE, INPUT_FEATURES_PAGE, OVERVIEW_PAGE, PORTFOLIO_PAGE  # noqa: E402
+
+# The page app.py starts at, and the interactions replayed after the first
+# run: ("radio", option) selects an input mode, ("button", label) clicks
+PAGES = {
+    "Overview": (OVERVIEW_PAGE, []),
+    "Input Features": (INPUT_FEATURES_PAGE, []),
+    "Bulk Upload": (INPUT_FEATURES_PAGE, [("radio", "Bulk Upload")]),
+    "Model Output": (INPUT_FEATURES_PAGE, [("button", "Generate Predictions")]),
+    "Portfolio Analytics": (PORTFOLIO_PAGE, []),
+    "Past Decisions": (DECISIONS_PAGE, []),
+}
+
+# Written to stderr once Streamlit and AppTest are loaded; imports before it
+# are not counted
+MARKER = "-- page starts --"
+
+DRIVER = """\
+import sys
+from streamlit.testing.v1 import AppTest
+
+# Load what Streamlit itself imports on a first script run
+AppTest.from_string("import streamlit as st\\nst.markdown('')").run()
+print({marker!r}, file=sys.stderr, flush=True)
+{run}
+if at.exception:
+    sys.exit("page failed: " + at.exception[0].value)
+"""
+
+PAGE_RUN = """
+at = AppTest.from_file("app.py", default_timeout=120)
+at.switch_page({page!r})
+at.run()
+for kind, value in {actions!r}:
+    if kind == "radio":
+        at.radio[0].set_value(value).run()
+    else:
+        [button for button in at.button if button.label == value][0].click().run()
+"""
+
+# Streamlit imports PyArrow, pandas and NumPy itself to render any custom
+# component, such as the Overview animation; this run finds what it loads
+COMPONENT_RUN = """
+at = AppTest.from_string(
+    "import streamlit.components.v1 as components\\n"
+    "components.declare_component('probe', url='http://localhost')(data=[1], key='probe')\\n"
+)
+at.run()
+"""
+
+# Must never be imported by a cold start on the Overview page, unless
+# Streamlit itself does (including to render a custom component)
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "plotly.graph_objects", "plotly.express", "matplotlib"]
+
+# A page regresses when it is slower than baseline * (1 + TOLERANCE) + SLACK_US
+TOLERANCE = 0.25
+SLACK_US = 30_000
+REPEAT = 5
+
+
+def _parse(lines):
+    # (cumulative us of the top-level imports, imported module names)
+    total = 0
+    imported = set()
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.add(name.strip())
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total, imported
+
+
+def measure(run):
+    """One cold run of the driver code ``run``: (import time in us, modules it imported, modules loaded before it)."""
+    code = DRIVER.format(marker=MARKER, run=run)
+    with tempfile.TemporaryDirectory(prefix="import-time-") as scratch:
+        # Submissions are recorded in a scratch application store
+        env = dict(os.environ, LENDING_STORE_PATH=os.path.join(scratch, "applications.db"),
+                   PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+    if result.returncode:
+        raise RuntimeError(f"driver failed:\n{run}\n{result.stderr[-2000:]}")
+    lines = result.stderr.splitlines()
+    start = lines.index(MARKER)
+    total, imported = _parse(lines[start + 1:])
+    return total, imported, _parse(lines[:start])[1]
+
+
+def run(repeat=REPEAT):
+    _, components, _ = measure(COMPONENT_RUN)
+    results = {}
+    for name, (page, actions) in PAGES.items():
+        runs = [measure(PAGE_RUN.format(page=page, actions=actions)) for _ in range(repeat)]
+        results[name] = {"us": min(total for total, _, _ in runs), "modules": sorted(runs[0][1]),
+                         "streamlit": sorted(runs[0][2] | components)}
+    return results
+
+
+def check(results, baseline):
+    failures = []
+    result = results["Overview"]
+    ours = set(result["modules"]) - set(result["streamlit"])
+    heavy = [m for m in HEAVY_MODULES if m in ours]
+    if heavy:
+        failures.append(f"Overview imports heavy modules: {', '.join(heavy)}")
+    for page, result in results.items():
+        if page not in baseline:
+            continue
+        limit = baseline[page]["us"] * (1 + TOLERANCE) + SLACK_US
+        if result["us"] > limit:
+            failures.append(f"{page}: {result['us'] / 1000:.0f} ms > limit {limit / 1000:.0f} ms "
+                            f"(baseline {baseline[page]['us'] / 1000:.0f} ms)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="record the results as the new baseline")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="cold runs per page (the fastest is kept)")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    width = max(len(page) for page in PAGES)
+    for page in PAGES:
+        result = results[page]
+        print(f"{page:<{width}} {result['us'] / 1000:8.1f} ms  ({len(result['modules'])} modules)")
+
+    if args.update:
+        BASELINE.write_text(json.dumps({page: {"us": results[page]["us"]} for page in PAGES}, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE}")
+        return 0
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    failures = check(results, baseline)
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Scaling of the multi-process batch runner with the number of workers.
+
+Scores the same synthetic book with ``lending.parallel.score_parallel`` at
+1, 2, 4, ... workers (up to the number of cores) and prints throughput,
+speedup over the first worker count and parallel efficiency. The input is a
+``.npy`` file, as for a real full-book run, so workers memory-map it.
+
+    python benchmarks/parallel.py
+    python benchmarks/parallel.py --rows 20000000 --workers 1 8 32
+
+There is no stored baseline: scaling depends on the core count, so compare
+runs on the same host.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from lending.parallel import SHARD_SIZE, score_parallel  # noqa: E402
+from lending.synthetic import synthetic_applicants  # noqa: E402
+
+ROWS = 10_000_000
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--workers", type=int, nargs="+", default=worker_counts())
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "book.npy")
+        book = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(args.rows, 30))
+        for start in range(0, args.rows, 1_000_000):
+            stop = min(start + 1_000_000, args.rows)
+            book[start:stop] = synthetic_applicants(stop - start, seed=start)
+        book.flush()
+        del book
+
+        first = None
+        print(f"{'workers':>7}  {'rows/sec':>14}  {'speedup':>7}  {'efficiency':>10}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            score_parallel(path, workers=workers, shard_size=args.shard_size)
+            rate = args.rows / (time.perf_counter() - start)
+            first = first or (workers, rate)
+            speedup = rate / first[1]
+            print(f"{workers:>7}  {rate:>14,.0f}  {speedup:>6.2f}x  {speedup * first[0] / workers:>10.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
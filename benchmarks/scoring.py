@@ -0,0 +1,213 @@
+"""Scoring benchmarks with regression gates.
+
+Measures, on synthetic applicants drawn from the ``feature_input_config``
+ranges:
+
+- single-applicant latency (p50/p99) for ``score_applicant``, a score cache
+  hit and a gauge figure build,
+- a 200x200 what-if sweep,
+- batch throughput (rows/sec) and peak memory of ``score_batch`` on the full
+  ``(n, 30)`` feature matrix at 1K, 100K and 10M applicants,
+- the Model Output page render, through Streamlit's AppTest.
+
+Results are compared with ``scoring_baseline.json``. Latency and memory may
+grow, and throughput may shrink, by at most ``TOLERANCE`` before the run
+fails.
+
+    python benchmarks/scoring.py                    # check against the baseline
+    python benchmarks/scoring.py --update           # record a new baseline
+    python benchmarks/scoring.py --sizes 1000 100000
+
+Baselines are machine specific; record one on the hardware you compare on.
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lending.applicant import Applicant  # noqa: E402
+from lending.scoring import cached_score_applicant, score_applicant, score_batch  # noqa: E402
+from lending.synthetic import synthetic_applicants  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "scoring_baseline.json"
+
+BATCH_SIZES = [1_000, 100_000, 10_000_000]
+SINGLE_ITERATIONS = 2_000
+SWEEP_ITERATIONS = 50
+RENDER_ITERATIONS = 20
+TOLERANCE = 0.30
+
+# Metric name suffixes where a bigger number is better
+HIGHER_IS_BETTER = ("rows_per_sec",)
+
+# Differences below these are timer/allocator noise, never a regression
+NOISE_FLOOR = {"_us": 20, "_ms": 5, "_mb": 1}
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50": samples[len(samples) // 2],
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def time_calls(fn, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_single(iterations=SINGLE_ITERATIONS):
+    rows = synthetic_applicants(iterations, seed=1)
+    applicants = [(Applicant(row),) for row in rows]
+    results = {}
+
+    p = percentiles(time_calls(score_applicant, applicants))
+    results["single.score_applicant.p50_us"] = p["p50"] * 1e6
+    results["single.score_applicant.p99_us"] = p["p99"] * 1e6
+
+    cached_score_applicant(applicants[0][0])
+    p = percentiles(time_calls(cached_score_applicant, [applicants[0]] * iterations))
+    results["single.cache_hit.p50_us"] = p["p50"] * 1e6
+    results["single.cache_hit.p99_us"] = p["p99"] * 1e6
+
+    try:
+        from lending.figures import figure_cache, gauge_figure
+    except ImportError:
+        return results
+    figure_cache.clear()
+    # Distinct values, so every call builds a figure
+    values = [("default_prob", i / 10) for i in range(min(iterations, 500))]
+    p = percentiles(time_calls(gauge_figure, values))
+    results["single.gauge_figure.p50_us"] = p["p50"] * 1e6
+    results["single.gauge_figure.p99_us"] = p["p99"] * 1e6
+    return results
+
+
+def bench_sweep(iterations=SWEEP_ITERATIONS):
+    from lending.sweep import sweep_2d
+
+    args = [("CREDIT_SCORE_AVG_CALC", "ALL_CREDIT_HISTORY_MONTHS_TOTAL", Applicant.defaults(), 200)]
+    sweep_2d(*args[0])  # warm up
+    p = percentiles(time_calls(sweep_2d, args * iterations))
+    return {
+        "sweep.200x200.p50_ms": p["p50"] * 1e3,
+        "sweep.200x200.p99_ms": p["p99"] * 1e3,
+    }
+
+
+def bench_batch(n):
+    # The full (n, 30) matrix, as uploads and populations carry every
+    # feature; 10M rows take 2.4 GB
+    frame = synthetic_applicants(n, seed=2)
+    score_batch(frame[:1000])  # warm up
+
+    gc.collect()
+    start = time.perf_counter()
+    score_batch(frame)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    score_batch(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        f"batch.{n}.rows_per_sec": n / elapsed,
+        f"batch.{n}.peak_mb": peak / 2**20,
+    }
+
+
+def bench_render(iterations=RENDER_ITERATIONS):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return {}
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+    at.session_state["prediction_made"] = True
+    at.session_state["feature_values"] = Applicant.defaults()
+    at.run()
+    at.switch_page("dashboard/pages/model_output.py").run()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(f"Model Output page failed: {at.exception[0].value}")
+    p = percentiles(timings)
+    return {
+        "render.model_output.p50_ms": p["p50"] * 1e3,
+        "render.model_output.p99_ms": p["p99"] * 1e3,
+    }
+
+
+def run(sizes=BATCH_SIZES, render=True):
+    results = bench_single()
+    results.update(bench_sweep())
+    for n in sizes:
+        results.update(bench_batch(n))
+    if render:
+        results.update(bench_render())
+    return results
+
+
+def _noise_floor(name):
+    return next((floor for suffix, floor in NOISE_FLOOR.items() if name.endswith(suffix)), 0)
+
+
+def check(results, baseline, tolerance=TOLERANCE):
+    failures = []
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if name.endswith(HIGHER_IS_BETTER):
+            if value < base * (1 - tolerance):
+                failures.append(f"{name}: {value:,.1f} < {base:,.1f} - {tolerance:.0%}")
+        elif value > base * (1 + tolerance) and value - base > _noise_floor(name):
+            failures.append(f"{name}: {value:,.1f} > {base:,.1f} + {tolerance:.0%}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="record the results as the new baseline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BATCH_SIZES, help="batch sizes to score")
+    parser.add_argument("--no-render", action="store_true", help="skip the page render benchmark")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, render=not args.no_render)
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        print(f"{name:<{width}}  {value:>16,.1f}")
+
+    if args.update:
+        baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        baseline.update(results)
+        BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE}")
+        return 0
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    failures = check(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Throughput and latency of the streaming consumer.
+
+A producer thread puts synthetic application records on a ``MemoryQueue`` at
+a fixed rate (or as fast as the queue accepts them) while a
+``StreamConsumer`` scores them into another, and the time from each record
+being put to its decision being written is measured. With ``--shadow``, a
+linear challenger model also shadows every batch, scored in the shadow
+process or, with ``--shadow thread``, on the shadow thread, where it
+competes with the consumer for the GIL.
+
+    python benchmarks/stream.py
+    python benchmarks/stream.py --records 200000 --rate 5000 --batch-size 250
+    python benchmarks/stream.py --shadow process
+
+There is no stored baseline; compare runs on the same host.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from lending.models import ModelRegistry, save_linear_model  # noqa: E402
+from lending.schema import feature_index, top_30_features  # noqa: E402
+from lending.shadow import ShadowScorer  # noqa: E402
+from lending.stream import BATCH_SIZE, MAX_WAIT, MemoryQueue, Sink, StreamConsumer  # noqa: E402
+from lending.synthetic import synthetic_applicants  # noqa: E402
+from lending.validation import CROSS_FIELD_RULES, VALIDATOR  # noqa: E402
+
+RECORDS = 100_000
+
+
+class TimingSink(Sink):
+    # Records when each decision was written
+    def __init__(self, n):
+        self.written = np.zeros(n)
+
+    def write(self, decisions):
+        now = time.perf_counter()
+        for decision in decisions:
+            self.written[decision["id"]] = now
+
+
+def records(n):
+    # Valid records: synthetic values, repaired into range and made consistent
+    values = VALIDATOR.clamp(synthetic_applicants(n, seed=0))
+    for rule in CROSS_FIELD_RULES:
+        i, j = feature_index[rule.feature], feature_index[rule.other]
+        values[:, i] = np.minimum(values[:, i], values[:, j])
+    return [dict(zip(top_30_features, row), id=k) for k, row in enumerate(values.tolist())]
+
+
+def shadow_scorer(mode, directory):
+    # A registry whose challenger is a linear model over every feature
+    if mode == "none":
+        return ModelRegistry(directory), None
+    models = ModelRegistry(directory)
+    save_linear_model(Path(directory) / "challenger.npz", np.full(len(top_30_features), 1e-3), -2.0)
+    models.challenge("challenger")
+    return models, ShadowScorer(models, log_path=None, process=mode == "process")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=RECORDS)
+    parser.add_argument("--rate", type=float, default=0, help="records per second to produce; 0 for unthrottled")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT)
+    parser.add_argument("--shadow", choices=["none", "thread", "process"], default="none",
+                        help="also shadow every batch with a challenger model")
+    args = parser.parse_args(argv)
+
+    batch = records(args.records)
+    directory = tempfile.mkdtemp(prefix="stream-bench-")
+    models, shadow = shadow_scorer(args.shadow, directory)
+    queue, sink = MemoryQueue(), TimingSink(args.records)
+    consumer = StreamConsumer(queue, sink, args.batch_size, args.max_wait, models=models, shadow=shadow)
+    stop = threading.Event()
+    thread = threading.Thread(target=consumer.run, args=(stop, 0.1))
+    thread.start()
+
+    put = np.zeros(args.records)
+    start = time.perf_counter()
+    for k, record in enumerate(batch):
+        if args.rate:
+            delay = start + k / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        put[k] = time.perf_counter()
+        queue.put(record)
+    while consumer.answered < args.records:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+
+    latency = (sink.written - put) * 1000
+    print(f"{args.records:,} records in {elapsed:.2f}s: {args.records / elapsed:,.0f} decisions/sec")
+    print(f"latency ms: p50 {np.percentile(latency, 50):.1f}  p99 {np.percentile(latency, 99):.1f}  "
+          f"max {latency.max():.1f}")
+    if shadow is not None:
+        shadow.join()
+        stats = shadow.stats()["challenger"]
+        print(f"shadow ({args.shadow}): {stats['scored']:,} scored, caught up "
+              f"{time.perf_counter() - start - elapsed:.2f}s after the last decision")
+    shutil.rmtree(directory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
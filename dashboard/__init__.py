@@ -0,0 +1,12 @@
+"""Streamlit views for the Lending Model Dashboard.
+
+``app.py`` is the entry point; it renders the shared page chrome and runs
+only the active page script from ``dashboard/pages``.
+"""
+
+# Page scripts, relative to app.py, for st.Page and st.switch_page
+OVERVIEW_PAGE = "dashboard/pages/overview.py"
+INPUT_FEATURES_PAGE = "dashboard/pages/input_features.py"
+MODEL_OUTPUT_PAGE = "dashboard/pages/model_output.py"
+PORTFOLIO_PAGE = "dashboard/pages/portfolio.py"
+DECISIONS_PAGE = "dashboard/pages/decisions.py"
@@ -0,0 +1,153 @@
+"""Page chrome shared by every dashboard page: styles, logo, sidebar and footer."""
+from pathlib import Path
+
+import streamlit as st
+
+from lending.metrics import timed
+
+LOGO_PATH = Path(__file__).resolve().parent.parent / "images.png"
+
+# Custom CSS for styling
+CUSTOM_CSS = """
+<style>
+    .main-header {
+        font-size: 2.5rem;
+        font-weight: 700;
+        color: #1E88E5;
+        margin-bottom: 1.5rem;
+    }
+    .sub-header {
+        font-size: 1.8rem;
+        font-weight: 600;
+        color: #333;
+        margin-top: 2rem;
+        margin-bottom: 1rem;
+    }
+    .card {
+        border-radius: 10px;
+        padding: 1.5rem;
+        background-color: #f8f9fa;
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        margin-bottom: 1rem;
+        transition: transform 0.3s ease, box-shadow 0.3s ease;
+    }
+    .card:hover {
+        transform: translateY(-5px);
+        box-shadow: 0 10px 20px rgba(0, 0, 0, 0.1);
+    }
+    .feature-card {
+        border-radius: 8px;
+        padding: 1rem;
+        background-color: #f0f2f6;
+        margin-bottom: 0.7rem;
+        border-left: 4px solid #1E88E5;
+    }
+    .icon-text {
+        font-size: 1.2rem;
+        font-weight: 500;
+        margin-left: 0.5rem;
+    }
+    .footer {
+        text-align: center;
+        padding: 1rem;
+        font-size: 0.8rem;
+        color: #666;
+        margin-top: 2rem;
+        border-top: 1px solid #eee;
+    }
+    .prediction-box {
+        border-radius: 10px;
+        padding: 1.5rem;
+        background-color: #e3f2fd;
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        margin-bottom: 1rem;
+        text-align: center;
+    }
+    .btn-primary {
+        background-color: #1E88E5;
+        color: white;
+        padding: 0.5rem 1rem;
+        border-radius: 5px;
+        text-align: center;
+        margin: 0.5rem 0;
+        cursor: pointer;
+        font-weight: 500;
+    }
+    .btn-secondary {
+        background-color: #78909C;
+        color: white;
+        padding: 0.5rem 1rem;
+        border-radius: 5px;
+        text-align: center;
+        margin: 0.5rem 0;
+        cursor: pointer;
+        font-weight: 500;
+    }
+    .company-logo {
+        position: absolute;
+        top: 0.5rem;
+        right: 1rem;
+        width: 180px;
+        z-index: 1000;
+    }
+    .sigmoid-text {
+        color: #E30613;
+        font-size: 28px;
+        font-weight: bold;
+        font-family: Arial, sans-serif;
+    }
+</style>
+"""
+
+
+# The logo is read from disk once per process
+@st.cache_resource(show_spinner=False)
+def load_logo():
+    return LOGO_PATH.read_bytes()
+
+
+def render_header():
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+    # Display real Sigmoid logo image at top-right of every page
+    col1, col2, col3 = st.columns([6, 2, 1])
+    with col3:
+        with timed("logo"):
+            st.image(load_logo(), width=140)
+
+
+def render_sidebar():
+    with st.sidebar:
+        st.image("https://img.icons8.com/clouds/100/bank-building.png", width=80)
+        st.title("Lending Model Dashboard")
+
+        st.markdown("---")
+        st.markdown("### About")
+        st.info(
+            "This dashboard demonstrates a predictive lending model focused on "
+            "estimating borrower risk and Cost of Funds (COF)."
+        )
+
+
+# Developer-only panel with the stage timings of the current rerun
+def render_timing_panel(timings, session_bytes=None):
+    with st.sidebar.expander("⏱️ Rerun timings", expanded=False):
+        if session_bytes is not None:
+            st.text(f"Session state {session_bytes / 1024:,.1f} KiB")
+        totals = {}
+        for stage, seconds in timings:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        width = max((len(stage) for stage in totals), default=0)
+        for stage, seconds in totals.items():
+            st.text(f"{stage:<{width}} {seconds * 1000:9.2f} ms")
+
+
+# Footer
+def add_footer():
+    st.markdown("---")
+    st.markdown(
+        '<div class="footer">© 2023 Lending Model Dashboard v1.0.0 | '
+        '<a href="https://github.com/yourusername" target="_blank">GitHub</a> | '
+        '<a href="https://linkedin.com/in/yourusername" target="_blank">LinkedIn</a></div>',
+        unsafe_allow_html=True
+    )
@@ -0,0 +1,115 @@
+"""Past Decisions page: look up recorded applications and their decisions."""
+from datetime import date, timedelta
+
+import streamlit as st
+
+from dashboard import MODEL_OUTPUT_PAGE
+from dashboard.layout import add_footer
+from lending.reports import FORMATS, report_generator
+from lending.scoring import RISK_LEVELS
+from lending.sessions import session_store
+from lending.store import application_store
+
+
+# Load a recorded application into the session and show it on the Model Output page
+def open_decision(decision):
+    # The Input Features widgets start over from the recorded values
+    for key in [key for key in st.session_state if str(key).startswith("input_")]:
+        del st.session_state[key]
+    st.session_state.feature_values = decision.applicant.copy()
+    st.session_state.prediction_made = True
+    st.session_state.application_id = decision.id
+    # Shown as recorded, not re-scored with the active model
+    st.session_state.decision = decision
+    st.switch_page(MODEL_OUTPUT_PAGE)
+
+
+def decisions_table(decisions):
+    return [
+        {
+            "Application": decision.id,
+            "Recorded": decision.created_at.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
+            "Default Probability": f"{decision.default_prob:.1%}",
+            "Risk Level": decision.risk_level,
+            "Eligibility": decision.eligibility,
+            "Key Risk Factors": ", ".join(decision.risk_factors),
+            "Model": decision.model,
+        }
+        for decision in decisions
+    ]
+
+
+st.markdown('<h1 class="main-header">Past Decisions</h1>', unsafe_allow_html=True)
+
+st.markdown(
+    """
+    Every application submitted on the Input Features page, and every bulk upload recorded in
+    the application store, can be looked up here by application id, date or risk level.
+    """
+)
+
+# Lookup by application id
+st.markdown('<h2 class="sub-header">Find an Application</h2>', unsafe_allow_html=True)
+id_col, button_col = st.columns([3, 1])
+with id_col:
+    application_id = st.number_input("Application id", min_value=1, value=1, step=1)
+with button_col:
+    st.markdown("<br>", unsafe_allow_html=True)
+    look_up = st.button("Open Application", use_container_width=True)
+if look_up:
+    decision = application_store.get(application_id)
+    if decision is None:
+        st.error(f"No application #{application_id} has been recorded.")
+    else:
+        open_decision(decision)
+
+# Search by date and risk level
+st.markdown('<h2 class="sub-header">Recent Decisions</h2>', unsafe_allow_html=True)
+filter_col1, filter_col2, filter_col3 = st.columns([2, 2, 1])
+with filter_col1:
+    today = date.today()
+    dates = st.date_input("Recorded between", value=(today - timedelta(days=7), today))
+with filter_col2:
+    risk_level = st.selectbox("Risk level", ["Any"] + [label for label, _ in RISK_LEVELS])
+with filter_col3:
+    limit = st.number_input("Show at most", min_value=10, max_value=5_000, value=200, step=10)
+
+# The end date is inclusive; a half-selected range covers just the first day
+start = dates[0] if dates else None
+end = (dates[-1] if dates else today) + timedelta(days=1)
+if risk_level == "Any":
+    decisions = application_store.by_date(start, end, limit=limit)
+else:
+    decisions = application_store.by_risk_level(risk_level, start, end, limit=limit)
+
+if not decisions:
+    st.info("No recorded decisions match these filters.")
+else:
+    st.dataframe(decisions_table(decisions), hide_index=True, use_container_width=True)
+    open_col, open_button_col = st.columns([3, 1])
+    with open_col:
+        selected = st.selectbox("Application", decisions, format_func=lambda d: f"#{d.id} – {d.risk_level}")
+    with open_button_col:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("Open Selected", use_container_width=True):
+            open_decision(selected)
+
+    # Reports for every decision listed above, as one ZIP (or one CSV)
+    format_col, report_col = st.columns([3, 1])
+    with format_col:
+        report_format = st.selectbox("Report format", list(FORMATS))
+    with report_col:
+        st.markdown("<br>", unsafe_allow_html=True)
+        prepare = st.button("Prepare Reports", use_container_width=True)
+    report_key = (report_format, tuple(decision.id for decision in decisions))
+    results = session_store.session(st.session_state)
+    if prepare:
+        with st.spinner(f"Preparing {len(decisions):,} reports..."):
+            data = report_generator.generate_decisions(decisions, report_format)
+        results.put("bulk_report", (report_key, data))
+    bulk_report = results.get("bulk_report")
+    if bulk_report is not None and bulk_report[0] == report_key:
+        extension, mime = ("csv", "text/csv") if report_format == "CSV" else ("zip", "application/zip")
+        st.download_button("Download Reports", bulk_report[1], file_name=f"lending_reports.{extension}", mime=mime)
+
+add_footer()
@@ -0,0 +1,200 @@
+"""Input Features page: single application form and bulk file upload."""
+import os
+import tempfile
+
+import streamlit as st
+
+from dashboard import MODEL_OUTPUT_PAGE
+from dashboard.layout import add_footer
+from lending.applicant import Applicant
+from lending.schema import feature_categories, feature_descriptions, feature_input_config
+
+
+# Delete a scored bulk file once the session no longer keeps it
+def remove_results(bulk_results):
+    if os.path.exists(bulk_results["path"]):
+        os.remove(bulk_results["path"])
+
+
+# The widget's starting value for a feature: the current application's
+# value, in the widget's range and of its number type
+def widget_value(feature, config):
+    value = min(max(st.session_state.feature_values[feature], config["min"]), config["max"])
+    return round(value) if isinstance(config["default"], int) else float(value)
+
+
+# Bulk scoring of an uploaded CSV/Parquet file, streamed in chunks
+def render_bulk_upload():
+    from lending.bulk import CHUNK_SIZE, file_type_for, missing_columns, read_columns, score_file
+    from lending.sessions import session_store
+
+    results = session_store.session(st.session_state)
+
+    st.markdown(
+        """
+        Upload a CSV or Parquet file with one application per row and a column for each of the
+        30 model features. The file is scored in chunks, so large files can be processed; files
+        over the upload limit can be scored on the server with
+        `python -m lending.bulk applications.parquet scored.csv`.
+        """
+    )
+
+    uploaded = st.file_uploader("Applications file", type=["csv", "parquet", "pq"])
+    if uploaded is None:
+        return
+
+    file_type = file_type_for(uploaded.name)
+    missing = missing_columns(read_columns(uploaded, file_type))
+    if missing:
+        st.error(f"The file is missing required columns: {', '.join(missing)}")
+        return
+
+    chunk_size = st.number_input("Rows per chunk", min_value=10_000, max_value=1_000_000,
+                                 value=CHUNK_SIZE, step=10_000)
+    record = st.checkbox("Record decisions in the application store", value=False)
+    validate = st.checkbox("Flag invalid rows", value=True,
+                           help="Add valid and errors columns listing out-of-range and inconsistent values")
+
+    if st.button("Score File", use_container_width=False):
+        from lending.models import model_registry
+
+        progress = st.progress(0.0, text="Scoring applications...")
+        done = 0
+
+        def on_progress(fraction, rows):
+            nonlocal done
+            done = rows
+            progress.progress(fraction, text=f"Scored {rows:,} applications")
+
+        # Results are written to disk chunk by chunk rather than kept in memory
+        results.pop("bulk_results")
+        store = None
+        if record:
+            from lending.store import application_store as store
+        out = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="")
+        rows = None
+        try:
+            with out:
+                rows = score_file(uploaded, file_type, out, chunk_size=chunk_size, on_progress=on_progress,
+                                  store=store, model=model_registry.active(), validate=validate)
+        except ValueError as e:
+            message = f"The file could not be scored: {e}"
+            if store is not None and done:
+                message += f"\n\nThe first {done:,} applications were already recorded in the application store."
+            st.error(message)
+        finally:
+            if rows is None:
+                os.remove(out.name)
+        if rows is None:
+            return
+        # The file is deleted when replaced, or when the session goes idle
+        results.put("bulk_results", {
+            "path": out.name,
+            "rows": rows,
+            "file_name": f"{os.path.splitext(uploaded.name)[0]}_scored.csv",
+        }, on_evict=remove_results)
+
+    bulk_results = results.get("bulk_results")
+    if bulk_results is not None and os.path.exists(bulk_results["path"]):
+        st.success(f"Scored {bulk_results['rows']:,} applications.")
+        with open(bulk_results["path"], "rb") as f:
+            st.download_button("Download Results", f, file_name=bulk_results["file_name"], mime="text/csv")
+
+
+st.markdown('<h1 class="main-header">Enter Loan Application Details</h1>', unsafe_allow_html=True)
+
+st.markdown(
+    """
+    Please enter values for all 30 features used in our lending model. These values will be used
+    to predict default probability, risk level, and loan eligibility.
+    """
+)
+
+input_mode = st.radio("Input mode", ["Single Application", "Bulk Upload"], horizontal=True)
+
+if input_mode == "Bulk Upload":
+    render_bulk_upload()
+else:
+    # Initialize session state for storing feature values
+    if 'feature_values' not in st.session_state:
+        st.session_state.feature_values = Applicant.defaults()
+
+    # Widget values; they become the application only when the form is submitted
+    values = {}
+
+    # Create form for input features
+    with st.form(key="feature_input_form"):
+        # Create tabs for each feature category
+        tabs = st.tabs(list(feature_categories.keys()))
+
+        # Add input fields for each feature by category
+        for i, (category, features) in enumerate(feature_categories.items()):
+            with tabs[i]:
+                for feature in features:
+                    if feature in feature_input_config:
+                        config = feature_input_config[feature]
+                        st.markdown(f'<div class="feature-card">', unsafe_allow_html=True)
+
+                        # Feature name and description
+                        st.markdown(f"**{feature}**")
+                        st.markdown(f"_{feature_descriptions.get(feature, 'Description not available')}_")
+
+                        # Input field based on configuration
+                        if config["type"] == "slider":
+                            values[feature] = st.slider(
+                                f"Value for {feature}",
+                                min_value=config["min"],
+                                max_value=config["max"],
+                                value=widget_value(feature, config),
+                                step=config.get("step", 1),
+                                key=f"input_{feature}"
+                            )
+                        elif config["type"] == "number":
+                            values[feature] = st.number_input(
+                                f"Value for {feature}",
+                                min_value=config["min"],
+                                max_value=config["max"],
+                                value=widget_value(feature, config),
+                                step=config.get("step", 1),
+                                key=f"input_{feature}"
+                            )
+
+                        st.markdown('</div>', unsafe_allow_html=True)
+
+        # Submit button at the bottom of the form
+        submit_col1, submit_col2, submit_col3 = st.columns([1, 2, 1])
+        with submit_col2:
+            submit_button = st.form_submit_button("Generate Predictions", use_container_width=True)
+
+            # Widgets enforce the ranges, but not the cross-field rules
+            errors = []
+            if submit_button:
+                from lending.validation import validate_applicant
+
+                applicant = st.session_state.feature_values.copy()
+                for feature, value in values.items():
+                    applicant[feature] = value
+                errors = validate_applicant(applicant)
+
+            if submit_button and not errors:
+                from lending.models import model_registry
+                from lending.shadow import shadow_scorer
+                from lending.store import application_store
+
+                st.session_state.feature_values = applicant
+                st.session_state.prediction_made = True
+                # Record the application so the decision can be looked up later
+                model = model_registry.active()
+                st.session_state.application_id = application_store.add(st.session_state.feature_values, model=model)
+                st.session_state.decision = None
+                # The challenger model, if any, scores it in the background
+                shadow_scorer.submit(st.session_state.feature_values.values, model,
+                                     application_ids=[st.session_state.application_id])
+                # Redirect to the Model Output page after submission
+                st.switch_page(MODEL_OUTPUT_PAGE)
+
+    if errors:
+        st.error("Please correct these values:\n\n"
+                 + "\n".join(f"- **{error['feature']}**: {error['error']}" for error in errors))
+
+add_footer()
@@ -0,0 +1,228 @@
+"""Model Output page: lending decision for the submitted application."""
+import streamlit as st
+
+from dashboard import INPUT_FEATURES_PAGE
+from dashboard.layout import add_footer
+from lending.applicant import Applicant
+from lending.figures import confidence_figure, default_prob_figure, what_if_figure
+from lending.metrics import timed
+from lending.models import heuristic_model, model_registry
+from lending.reports import FORMATS, report_generator
+from lending.schema import feature_input_config
+from lending.scoring import SCORE_COMPONENTS, cached_score_applicant, cached_score_state
+from lending.sessions import session_store
+from lending.sweep import DEFAULT_POINTS
+
+
+st.markdown('<h1 class="main-header">Lending Decision Results</h1>', unsafe_allow_html=True)
+
+# Check if predictions were made
+if "prediction_made" in st.session_state and st.session_state.prediction_made:
+    # Get feature values from session state
+    feature_values = st.session_state.feature_values
+
+    # The active model version; swapped in place when a new one is activated
+    model = model_registry.active()
+    # A decision reopened from Past Decisions is shown as it was issued, and
+    # swept with the model that issued it, until its features are edited
+    decision = st.session_state.get("decision")
+    if decision is not None and decision.applicant != feature_values:
+        # No longer the recorded application
+        decision = st.session_state.decision = None
+        st.session_state.application_id = None
+    if decision is not None:
+        try:
+            model = model_registry.get(decision.model)
+        except (KeyError, OSError, ValueError):
+            # The recorded version is gone; sweep with the active one
+            pass
+    # Derived results; dropped if the session goes idle, and recomputed
+    results = session_store.session(st.session_state)
+    score_state = None
+    with timed("scoring"):
+        if decision is not None:
+            prediction = decision.prediction()
+        elif model is heuristic_model:
+            # Looked up in the score cache shared by every session; on a miss
+            # after an edit only the rules that read the edited features are
+            # re-run
+            score_state = results.get("score_state")
+            if score_state is None or score_state.applicant != feature_values:
+                score_state = cached_score_state(feature_values, score_state)
+                results.put("score_state", score_state)
+            prediction = score_state.prediction
+        else:
+            prediction = cached_score_applicant(feature_values, model)
+    default_prob = prediction["default_prob"]
+    risk_level = prediction["risk_level"]
+    risk_color = prediction["risk_color"]
+    eligible = prediction["eligible"]
+    eligible_color = prediction["eligible_color"]
+    eligible_text = prediction["eligible_text"]
+    risk_factors = prediction["risk_factors"]
+
+    if st.session_state.get("application_id") is not None:
+        st.caption(f"Application #{st.session_state.application_id} · scored with model {prediction['model']}")
+    else:
+        st.caption(f"Scored with model {prediction['model']}")
+
+    # Display the results in three columns
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown('<div class="prediction-box">', unsafe_allow_html=True)
+        st.markdown("#### Default Probability")
+        st.markdown(f"<h2>{default_prob:.1%}</h2>", unsafe_allow_html=True)
+
+        # Gauge chart for default probability
+        with timed("figure"):
+            fig = default_prob_figure(default_prob)
+        with timed("plotly_chart"):
+            st.plotly_chart(fig, use_container_width=True)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="prediction-box">', unsafe_allow_html=True)
+        st.markdown("#### Risk Level")
+        st.markdown(f"<h2 style='color: {risk_color}'>{risk_level}</h2>", unsafe_allow_html=True)
+
+        # Key risk factors that contributed to the risk assessment
+        st.markdown("#### Key Risk Factors")
+
+        if not risk_factors:
+            st.markdown("No significant risk factors identified.")
+        else:
+            for factor in risk_factors[:3]:  # Show top 3 factors
+                st.markdown(f"• {factor}")
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col3:
+        st.markdown('<div class="prediction-box">', unsafe_allow_html=True)
+        st.markdown("#### Loan Eligibility")
+        st.markdown(f"<h2 style='color: {eligible_color}'>{eligible}</h2>", unsafe_allow_html=True)
+        st.markdown(f"{eligible_text}")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # Display additional details and summary
+    st.markdown('<h2 class="sub-header">Application Summary</h2>', unsafe_allow_html=True)
+
+    # Two columns for summary stats
+    summary_col1, summary_col2 = st.columns(2)
+
+    with summary_col1:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("### Applicant Profile")
+
+        metrics_col1, metrics_col2 = st.columns(2)
+        with metrics_col1:
+            st.metric("Credit Score", f"{feature_values.get('CREDIT_SCORE_AVG_CALC', 680):,.0f}")
+            st.metric("Annual Income", f"${feature_values.get('FE_TOTAL_INCOME', 75000):,.0f}")
+            st.metric("DTI Ratio", f"{feature_values.get('FE_DEBT_TO_INCOME', 0.32):.1%}")
+
+        with metrics_col2:
+            st.metric("Payment History", f"{feature_values.get('PAYMENT_MADE_CNT_TOTAL', 24)} payments")
+            st.metric("Delinquencies", feature_values.get("DELINQ_CNT_30_DAY_TOTAL", 0))
+            st.metric("LTV Ratio", f"{feature_values.get('LTV_FRONT', 0.9):.1%}")
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with summary_col2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("### Model Confidence")
+
+        # Model confidence is based on the number of risk factors
+        with timed("figure"):
+            confidence_fig = confidence_figure(prediction["confidence"])
+        with timed("plotly_chart"):
+            st.plotly_chart(confidence_fig, use_container_width=True)
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # Contribution of each score component, with the ones the last edit changed
+    if score_state is not None:
+        with st.expander("Score Breakdown"):
+            st.dataframe(
+                [
+                    {
+                        "Component": SCORE_COMPONENTS.get(feature, feature),
+                        "Value": feature_values[feature],
+                        "Contribution": f"{delta:+.1%}",
+                        "Changed": feature in score_state.changed,
+                    }
+                    for feature, delta in score_state.breakdown()
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+
+    # What-if analysis: sweep one or two features over their whole range,
+    # holding the rest of the application fixed. Off by default, so other
+    # reruns of the page don't pay for it; figures are cached per applicant
+    st.markdown('<h2 class="sub-header">What-If Analysis</h2>', unsafe_allow_html=True)
+
+    if st.toggle("Explore what-if scenarios", value=False, key="what_if"):
+        sweep_col1, sweep_col2 = st.columns([3, 1])
+        with sweep_col1:
+            sweep_features = st.multiselect(
+                "Features to vary (one for a curve, two for a heatmap)",
+                list(feature_input_config.keys()),
+                default=["CREDIT_SCORE_AVG_CALC"],
+                max_selections=2,
+            )
+        with sweep_col2:
+            points = st.number_input("Grid points per feature", min_value=10, max_value=400,
+                                     value=DEFAULT_POINTS, step=10)
+
+        if sweep_features:
+            with timed("sweep"):
+                sweep_fig = what_if_figure(sweep_features, feature_values, int(points), model)
+            with timed("plotly_chart"):
+                st.plotly_chart(sweep_fig, use_container_width=True)
+
+    # Action buttons
+    btn_col1, btn_col2, btn_col3 = st.columns([1, 1, 1])
+    with btn_col1:
+        report_format = st.selectbox("Report format", list(FORMATS), label_visibility="collapsed")
+        application_id = st.session_state.get("application_id")
+        report_key = (report_format, feature_values.digest(), application_id,
+                      prediction["model"] if decision is not None else model.cache_key)
+        if st.button("Download Report", use_container_width=True):
+            # Rendered on the report worker pool; only this session waits for it
+            with st.spinner("Preparing report..."):
+                if decision is not None:
+                    data = report_generator.generate_decision(decision, report_format)
+                else:
+                    data = report_generator.generate(feature_values, report_format, application_id, model)
+            results.put("report", (report_key, data))
+        report = results.get("report")
+        if report is not None and report[0] == report_key:
+            extension, mime = FORMATS[report_format]
+            stem = "lending_report" if application_id is None else f"application_{application_id}"
+            st.download_button(f"Save {report_format}", report[1], file_name=f"{stem}.{extension}", mime=mime,
+                               use_container_width=True)
+    with btn_col2:
+        if st.button("Adjust Features", use_container_width=True):
+            # Redirect back to the input page
+            st.switch_page(INPUT_FEATURES_PAGE)
+    with btn_col3:
+        if st.button("New Application", use_container_width=True):
+            # Start over from the default feature values
+            for key in [key for key in st.session_state if str(key).startswith("input_")]:
+                del st.session_state[key]
+            st.session_state.feature_values = Applicant.defaults()
+            st.session_state.prediction_made = False
+            st.session_state.application_id = None
+            st.session_state.decision = None
+            st.switch_page(INPUT_FEATURES_PAGE)
+
+else:
+    # If no prediction was made, prompt the user to go to the Input Features page
+    st.info("Please enter application details on the 'Input Features' page to see lending decision results.")
+
+    if st.button("Go to Input Features", use_container_width=False):
+        # Redirect to the input features page
+        st.switch_page(INPUT_FEATURES_PAGE)
+
+add_footer()
@@ -0,0 +1,99 @@
+"""Lending Model Overview page."""
+import streamlit as st
+from streamlit_lottie import st_lottie
+
+from dashboard.layout import add_footer
+from lending.assets import lottie_loader
+from lending.metrics import timed
+
+
+# Show a Lottie animation, or a static placeholder if it isn't available
+def show_lottie(animation, key, icon, height=200):
+    if animation is None:
+        st.markdown(f"<div style='font-size: 5rem; text-align: center; height: {height}px'>{icon}</div>",
+                    unsafe_allow_html=True)
+    else:
+        st_lottie(animation, height=height, key=key)
+
+
+st.markdown('<h1 class="main-header">Lending Model – Predicting Risk and COF</h1>', unsafe_allow_html=True)
+
+st.markdown(
+    """
+    This dashboard demonstrates a predictive lending model focused on estimating borrower risk 
+    and Cost of Funds (COF). It uses credit, income, delinquency, and account-related features 
+    to provide insights and predictions for banking and financial systems.
+    """
+)
+
+# Animation section; both animations load in parallel, and any that isn't
+# ready within the page timeout is shown as a placeholder
+with timed("lottie"):
+    animations = lottie_loader.get_many(["money", "risk"])
+col1, col2 = st.columns(2)
+
+with col1:
+    show_lottie(animations["money"], "money", "💰")
+
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown("### 💰 What is COF?")
+    st.markdown(
+        """
+        Cost of Funds (COF) represents the interest expense a financial institution must pay for 
+        the money they use in their lending operations. It's a critical metric for determining 
+        loan pricing and profitability.
+        """
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
+
+with col2:
+    show_lottie(animations["risk"], "risk", "⚠️")
+
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown("### ⚠️ Risk Prediction")
+    st.markdown(
+        """
+        Our model evaluates borrower attributes to predict the likelihood of default or late payments. 
+        This helps lenders make informed decisions about loan approvals and interest rates.
+        """
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
+
+st.markdown('<h2 class="sub-header">Benefits of the Model</h2>', unsafe_allow_html=True)
+
+benefit_cols = st.columns(3)
+
+with benefit_cols[0]:
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown("### 📈 Improved Accuracy")
+    st.markdown(
+        """
+        Our model achieves 30% better prediction accuracy compared to traditional 
+        credit scoring methods, resulting in fewer bad loans.
+        """
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
+
+with benefit_cols[1]:
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown("### ⏱️ Faster Decisions")
+    st.markdown(
+        """
+        Automated risk assessment reduces loan processing time from days to minutes, 
+        improving customer satisfaction and operational efficiency.
+        """
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
+
+with benefit_cols[2]:
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown("### 🔍 Deeper Insights")
+    st.markdown(
+        """
+        The model identifies non-obvious relationships between borrower attributes and 
+        loan performance, allowing for more nuanced lending strategies.
+        """
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
+
+add_footer()
@@ -0,0 +1,158 @@
+"""Portfolio Analytics page: distributions over a whole scored population."""
+import os
+
+import streamlit as st
+
+from dashboard.layout import add_footer
+from lending.figures import band_bar_figure, feature_breakdown_figure, prob_histogram_figure
+from lending.metrics import timed
+from lending.models import model_registry
+from lending.portfolio import PortfolioSummary, summarize_file, summarize_population, summarize_synthetic
+from lending.schema import feature_categories, feature_descriptions
+from lending.sessions import session_store
+
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+# Populations are opened once per process and shared by every session; the
+# columns are memory-mapped, so sessions share one copy in the page cache
+@st.cache_resource(show_spinner=False, max_entries=8)
+def open_population(path, mtime):
+    from lending.population import Population
+
+    return Population(path)
+
+
+# Build a summary from the chosen source; only the summary is kept for the
+# session, never the population itself
+def load_summary(results):
+    source = st.radio("Population", ["Applications file", "Population on disk", "Precomputed summary",
+                                     "Synthetic population"], horizontal=True)
+
+    if source == "Applications file":
+        from lending.bulk import file_type_for
+
+        uploaded = st.file_uploader("Applications file (CSV or Parquet with the 30 model features)",
+                                    type=["csv", "parquet", "pq"])
+        if uploaded is not None and st.button("Build Summary"):
+            progress = st.progress(0.0, text="Scoring applications...")
+
+            def on_progress(fraction, rows):
+                progress.progress(fraction, text=f"Summarized {rows:,} applications")
+
+            try:
+                summary = summarize_file(uploaded, file_type_for(uploaded.name), on_progress=on_progress,
+                                         model=model_registry.active())
+            except ValueError as e:
+                st.error(str(e))
+                return
+            results.put("portfolio_summary", (uploaded.name, summary))
+
+    elif source == "Population on disk":
+        from lending.population import HEADER_FILE, POPULATION_ROOT, list_populations
+
+        st.markdown(f"Create one with `python -m lending.population convert applications.parquet "
+                    f"{POPULATION_ROOT}/book.pop`.")
+        # Only populations under the configured root can be opened
+        names = list_populations()
+        if not names:
+            st.info(f"No populations found in {POPULATION_ROOT}.")
+            return
+        name = st.selectbox("Population", names)
+        if st.button("Build Summary"):
+            path = os.path.join(POPULATION_ROOT, name)
+            try:
+                population = open_population(path, os.stat(os.path.join(path, HEADER_FILE)).st_mtime_ns)
+            except (ValueError, OSError) as e:
+                st.error(f"Not a valid population: {e}")
+                return
+            progress = st.progress(0.0, text="Summarizing applications...")
+
+            def on_progress(fraction, rows):
+                progress.progress(fraction, text=f"Summarized {rows:,} applications")
+
+            summary = summarize_population(population, on_progress=on_progress, model=model_registry.active())
+            results.put("portfolio_summary", (f"{name} ({len(population):,} applications)", summary))
+
+    elif source == "Precomputed summary":
+        st.markdown("Create one with `python -m lending.portfolio applications.parquet summary.npz`.")
+        uploaded = st.file_uploader("Summary file", type=["npz"])
+        if uploaded is not None and st.button("Load Summary"):
+            try:
+                summary = PortfolioSummary.load(uploaded)
+            except (ValueError, KeyError, OSError) as e:
+                st.error(f"Not a valid portfolio summary: {e}")
+                return
+            results.put("portfolio_summary", (uploaded.name, summary))
+
+    else:
+        rows = st.number_input("Applications", min_value=10_000, max_value=50_000_000,
+                               value=1_000_000, step=100_000)
+        if st.button("Generate Population"):
+            progress = st.progress(0.0, text="Scoring applications...")
+
+            def on_progress(fraction, done):
+                progress.progress(fraction, text=f"Summarized {done:,} applications")
+
+            summary = summarize_synthetic(int(rows), on_progress=on_progress, model=model_registry.active())
+            results.put("portfolio_summary", (f"{int(rows):,} synthetic applications", summary))
+
+
+st.markdown('<h1 class="main-header">Portfolio Analytics</h1>', unsafe_allow_html=True)
+
+st.markdown(
+    """
+    Score a whole population of applications and explore how risk and eligibility are
+    distributed across it. Charts are drawn from precomputed summaries, so populations of
+    millions of applications stay responsive.
+    """
+)
+
+results = session_store.session(st.session_state)
+load_summary(results)
+
+loaded = results.get("portfolio_summary")
+if loaded is None:
+    st.info("Choose a population above to see its portfolio analytics.")
+else:
+    name, summary = loaded
+    st.markdown(f'<h2 class="sub-header">{name}</h2>', unsafe_allow_html=True)
+
+    quantiles = dict(zip(QUANTILES, summary.quantiles(list(QUANTILES.values()))))
+    eligibility = summary.band_table("eligibility")
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("Applications", f"{summary.rows:,}")
+    metric_cols[1].metric("Mean Default Probability", f"{summary.mean_default_prob:.1%}")
+    metric_cols[2].metric("Median Default Probability", f"{quantiles['p50']:.1%}")
+    metric_cols[3].metric("Approved", f"{eligibility['share'].iloc[0]:.1%}")
+
+    with timed("figure"):
+        risk_fig = band_bar_figure(summary.band_table("risk_level"), "Risk Level")
+        eligibility_fig = band_bar_figure(eligibility, "Loan Eligibility")
+        histogram_fig = prob_histogram_figure(*summary.prob_histogram(), quantiles=quantiles)
+
+    with timed("plotly_chart"):
+        dist_col1, dist_col2 = st.columns(2)
+        with dist_col1:
+            st.plotly_chart(risk_fig, use_container_width=True)
+        with dist_col2:
+            st.plotly_chart(eligibility_fig, use_container_width=True)
+        st.plotly_chart(histogram_fig, use_container_width=True)
+
+    st.markdown("### Key Risk Factors")
+    st.dataframe(summary.risk_factor_table(), hide_index=True, use_container_width=True,
+                 column_config={"share": st.column_config.ProgressColumn("share", min_value=0, max_value=1)})
+
+    # Breakdowns by feature category
+    st.markdown('<h2 class="sub-header">Breakdown by Feature Category</h2>', unsafe_allow_html=True)
+    tabs = st.tabs(list(feature_categories.keys()))
+    for tab, (category, features) in zip(tabs, feature_categories.items()):
+        with tab:
+            st.dataframe(summary.category_table(category), hide_index=True, use_container_width=True)
+            feature = st.selectbox("Feature", features, key=f"portfolio_feature_{category}")
+            st.markdown(f"_{feature_descriptions.get(feature, 'Description not available')}_")
+            with timed("plotly_chart"):
+                st.plotly_chart(feature_breakdown_figure(summary.feature_table(feature), feature),
+                                use_container_width=True)
+
+add_footer()
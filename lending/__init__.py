@@ -0,0 +1 @@
+"""Lending model: feature schema and scoring shared by the dashboard."""
@@ -0,0 +1,124 @@
+"""Fixed-layout applicant record.
+
+An ``Applicant`` holds the 30 model features in a single float64 array laid
+out by ``top_30_features``, instead of a dict of Python objects. It supports
+the dict-style access the dashboard uses (``applicant["LTV_FRONT"]``,
+``applicant.get(...)``) and serializes to a fixed 240-byte little-endian
+buffer that can be stored, hashed or sent to another process.
+"""
+import hashlib
+
+import numpy as np
+
+from lending.schema import count_features, feature_index, feature_input_config, top_30_features
+
+# Serialized layout: one little-endian float64 per feature
+DTYPE = np.dtype("<f8")
+RECORD_SIZE = DTYPE.itemsize * len(top_30_features)
+
+
+# Count features are handed back as ints
+INTEGER_FEATURES = frozenset(count_features)
+
+
+DEFAULT_VALUES = np.array([feature_input_config[feature]["default"] for feature in top_30_features], dtype=DTYPE)
+DEFAULT_VALUES.flags.writeable = False
+
+
+class Applicant:
+    __slots__ = ("values",)
+
+    def __init__(self, values=None):
+        if values is None:
+            values = DEFAULT_VALUES
+        values = np.array(values, dtype=DTYPE)
+        if values.shape != (len(top_30_features),):
+            raise ValueError(f"expected {len(top_30_features)} feature values, got shape {values.shape}")
+        self.values = values
+
+    @classmethod
+    def defaults(cls):
+        """An applicant with every feature at its configured default.
+
+        It shares the read-only ``DEFAULT_VALUES`` until a feature is changed,
+        so sessions that keep the defaults hold no copy of their own.
+        """
+        applicant = cls.__new__(cls)
+        applicant.values = DEFAULT_VALUES
+        return applicant
+
+    @classmethod
+    def from_dict(cls, feature_values):
+        """Build from a ``{feature: value}`` dict; missing features use defaults."""
+        applicant = cls(DEFAULT_VALUES)
+        for feature, value in feature_values.items():
+            applicant[feature] = value
+        return applicant
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) != RECORD_SIZE:
+            raise ValueError(f"expected {RECORD_SIZE} bytes, got {len(data)}")
+        return cls(np.frombuffer(data, dtype=DTYPE))
+
+    def to_bytes(self):
+        return self.values.tobytes()
+
+    def cache_key(self):
+        """Canonical bytes of the feature values, for use as a cache key."""
+        # Adding 0.0 folds -0.0 into 0.0 so equal inputs give equal keys
+        return (self.values + 0.0).tobytes()
+
+    def digest(self):
+        """Stable hex digest of the feature values."""
+        return hashlib.blake2b(self.cache_key(), digest_size=16).hexdigest()
+
+    def to_dict(self):
+        return {feature: self[feature] for feature in top_30_features}
+
+    def __getitem__(self, feature):
+        value = self.values[feature_index[feature]].item()
+        # Anything else, including a fractional or missing count, as stored
+        return int(value) if feature in INTEGER_FEATURES and value.is_integer() else value
+
+    def __setitem__(self, feature, value):
+        i = feature_index[feature]
+        if not self.values.flags.writeable:
+            if self.values[i] == value:
+                return
+            self.values = self.values.copy()  # copy on first change
+        self.values[i] = value
+
+    def __contains__(self, feature):
+        return feature in feature_index
+
+    def __iter__(self):
+        return iter(top_30_features)
+
+    def __len__(self):
+        return len(top_30_features)
+
+    def get(self, feature, default=None):
+        return self[feature] if feature in feature_index else default
+
+    def keys(self):
+        return list(top_30_features)
+
+    def items(self):
+        return [(feature, self[feature]) for feature in top_30_features]
+
+    def copy(self):
+        if self.values is DEFAULT_VALUES:
+            return Applicant.defaults()
+        return Applicant(self.values)
+
+    def __eq__(self, other):
+        if not isinstance(other, Applicant):
+            return NotImplemented
+        return self.values.tobytes() == other.values.tobytes()
+
+    def __reduce__(self):
+        return Applicant.from_bytes, (self.to_bytes(),)
+
+    def __repr__(self):
+        return f"Applicant({self.to_dict()!r})"
@@ -0,0 +1,195 @@
+"""Local cache for the Lottie animations shown on the Overview page.
+
+Animations are looked up in a local cache directory first and fall back to
+the copies bundled in ``assets/lottie``, so pages render without network
+access. When a refresh TTL is configured, stale cache entries are re-fetched
+from lottiefiles.com through a pooled session with timeouts; any network
+failure just keeps the local copy.
+
+``lottie_loader`` loads several animations in parallel on a thread pool and
+keeps them in memory, so a page waits for its slowest asset rather than the
+sum of all of them, and never longer than its timeout.
+
+Run ``python -m lending.assets`` to download the animations into the cache.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+LOTTIE_ANIMATIONS = {
+    "money": "https://assets9.lottiefiles.com/packages/lf20_06a6pf9i.json",
+    "risk": "https://assets3.lottiefiles.com/packages/lf20_ydo1amjm.json",
+}
+
+BUNDLED_DIR = Path(__file__).resolve().parent.parent / "assets" / "lottie"
+CACHE_DIR = Path(os.environ.get("LENDING_ASSET_CACHE", Path.home() / ".cache" / "lending-dashboard" / "lottie"))
+
+# Seconds before a cached animation is re-fetched; unset means never fetch
+REFRESH_TTL = float(os.environ["LENDING_ASSET_TTL"]) if os.environ.get("LENDING_ASSET_TTL") else None
+
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (2, 5)
+
+# Longest a page waits for its assets before rendering placeholders
+PAGE_ASSET_TIMEOUT = 1.0
+
+_session = None
+
+
+def _get_session():
+    # One pooled session per process, created on first fetch
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _session = requests.Session()
+        _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=1))
+    return _session
+
+
+def fetch_lottie(url, timeout=REQUEST_TIMEOUT):
+    """Fetch an animation, returning ``None`` on any network or HTTP error."""
+    import requests
+
+    try:
+        r = _get_session().get(url, timeout=timeout)
+    except requests.RequestException:
+        return None
+    if r.status_code != 200:
+        return None
+    try:
+        return r.json()
+    except ValueError:
+        return None
+
+
+def _write_json(path, data):
+    # Write to a temporary file first so readers never see a partial file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_lottie(name, refresh_ttl=REFRESH_TTL):
+    """Return the animation registered as ``name``, or ``None`` if unavailable."""
+    cached = CACHE_DIR / f"{name}.json"
+    if refresh_ttl is not None:
+        try:
+            stale = time.time() - cached.stat().st_mtime > refresh_ttl
+        except OSError:
+            stale = True
+        if stale:
+            data = fetch_lottie(LOTTIE_ANIMATIONS[name])
+            if data is not None:
+                try:
+                    _write_json(cached, data)
+                except OSError:
+                    pass
+                return data
+
+    for path in (cached, BUNDLED_DIR / f"{name}.json"):
+        data = _read_json(path)
+        if data is not None:
+            return data
+    return None
+
+
+class AssetLoader:
+    """Loads named assets on a thread pool and keeps them in memory.
+
+    Loads still running when ``get_many`` times out keep going in the
+    background, and their results are served on the next call.
+    """
+
+    def __init__(self, load, ttl=None, max_workers=4):
+        self._load = load
+        self._ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-loader")
+        # Reentrant: a done callback can run in the submitting thread
+        self._lock = threading.RLock()
+        self._loaded = {}  # name -> (value, loaded_at)
+        self._pending = {}  # name -> Future
+
+    def _fresh(self, name):
+        entry = self._loaded.get(name)
+        if entry is None:
+            return False
+        return self._ttl is None or time.monotonic() - entry[1] < self._ttl
+
+    def _submit(self, name):
+        # Called with the lock held; one in-flight load per asset
+        future = self._pending.get(name)
+        if future is None:
+            future = self._executor.submit(self._load, name)
+            future.add_done_callback(lambda f, name=name: self._finish(name, f))
+            self._pending[name] = future
+        return future
+
+    def _finish(self, name, future):
+        with self._lock:
+            self._pending.pop(name, None)
+            if future.exception() is None:
+                self._loaded[name] = (future.result(), time.monotonic())
+
+    def get_many(self, names, timeout=PAGE_ASSET_TIMEOUT):
+        """Return ``{name: asset}``, with ``None`` for assets not ready within ``timeout`` seconds."""
+        results = {}
+        futures = {}
+        with self._lock:
+            for name in names:
+                if self._fresh(name):
+                    results[name] = self._loaded[name][0]
+                else:
+                    futures[name] = self._submit(name)
+        if futures:
+            wait(futures.values(), timeout=timeout)
+        for name, future in futures.items():
+            if future.done() and future.exception() is None:
+                results[name] = future.result()
+            else:
+                # Not ready in time: serve a stale copy if there is one
+                entry = self._loaded.get(name)
+                results[name] = entry[0] if entry is not None else None
+        return results
+
+    def get(self, name, timeout=PAGE_ASSET_TIMEOUT):
+        return self.get_many([name], timeout)[name]
+
+
+lottie_loader = AssetLoader(load_lottie, ttl=REFRESH_TTL)
+
+
+def download_all(target=CACHE_DIR):
+    """Download every animation into ``target``; returns the names that failed."""
+    failed = []
+    for name, url in LOTTIE_ANIMATIONS.items():
+        data = fetch_lottie(url)
+        if data is None:
+            failed.append(name)
+        else:
+            _write_json(Path(target) / f"{name}.json", data)
+    return failed
+
+
+if __name__ == "__main__":
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else CACHE_DIR
+    failed = download_all(target)
+    for name in failed:
+        print(f"Could not download '{name}' from {LOTTIE_ANIMATIONS[name]}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
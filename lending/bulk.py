@@ -0,0 +1,188 @@
+"""Chunked bulk scoring of CSV and Parquet application files.
+
+Files are read a fixed number of rows at a time and each chunk is scored and
+written out before the next one is read, so memory stays flat regardless of
+file size. Files too large to upload to the dashboard can be scored on the
+server:
+
+    python -m lending.bulk applications.parquet scored.csv --validate
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from lending.schema import top_30_features
+from lending.scoring import RISK_FACTORS, SCORED_FEATURES, score_batch
+from lending.validation import VALIDATOR
+
+CHUNK_SIZE = 100_000
+
+FILE_TYPES = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+
+# Columns ``score_file`` can write; passthrough columns with these names are
+# renamed (see ``passthrough_names``)
+OUTPUT_COLUMNS = ["row", "application_id", "valid", "errors",
+                  "default_prob", "risk_level", "eligibility", "confidence", *RISK_FACTORS]
+
+PASSTHROUGH_PREFIX = "input_"
+
+
+def file_type_for(name):
+    """Return ``"csv"`` or ``"parquet"`` based on the file name."""
+    suffix = os.path.splitext(name)[1].lower()
+    if suffix not in FILE_TYPES:
+        raise ValueError(f"Unsupported file type '{suffix}', expected one of: {', '.join(FILE_TYPES)}")
+    return FILE_TYPES[suffix]
+
+
+def _parquet_file(source):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet files requires pyarrow: pip install pyarrow") from e
+    return pq.ParquetFile(source)
+
+
+def read_columns(source, file_type):
+    """Read only the header / schema of ``source``."""
+    if file_type == "parquet":
+        return list(_parquet_file(source).schema_arrow.names)
+    columns = list(pd.read_csv(source, nrows=0).columns)
+    source.seek(0)
+    return columns
+
+
+def missing_columns(columns):
+    """Return the entries of ``top_30_features`` not present in ``columns``."""
+    present = set(columns)
+    return [feature for feature in top_30_features if feature not in present]
+
+
+def passthrough_names(columns):
+    """Output names of passthrough ``columns``, ``input_``-prefixed where they clash with ``OUTPUT_COLUMNS``."""
+    taken = set(OUTPUT_COLUMNS) | set(columns)
+    names = []
+    for column in columns:
+        name = column
+        if column in OUTPUT_COLUMNS:
+            name = PASSTHROUGH_PREFIX + column
+            while name in taken:
+                name = PASSTHROUGH_PREFIX + name
+            taken.add(name)
+        names.append(name)
+    return names
+
+
+def iter_chunks(source, file_type, columns, chunk_size=CHUNK_SIZE, typed=True):
+    """Yield ``(chunk, progress)`` pairs reading ``columns`` from ``source``.
+
+    ``progress`` is the fraction of the file consumed so far, in [0, 1].
+    Features are read as float64, with values that aren't numbers read as
+    missing, unless ``typed`` is false, in which case such values are kept
+    as read.
+    """
+    if file_type == "parquet":
+        parquet = _parquet_file(source)
+        total = max(parquet.metadata.num_rows, 1)
+        done = 0
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+            chunk = batch.to_pandas()
+            done += len(chunk)
+            yield _as_float(chunk) if typed else chunk, done / total
+        return
+
+    source.seek(0, os.SEEK_END)
+    total = max(source.tell(), 1)
+    source.seek(0)
+    for chunk in pd.read_csv(source, usecols=columns, chunksize=chunk_size):
+        yield _as_float(chunk) if typed else chunk, min(source.tell() / total, 1.0)
+
+
+def _as_float(chunk):
+    # Feature columns as float64; a column holding anything but numbers is
+    # converted value by value, with the rest becoming NaN
+    for feature in chunk.columns.intersection(top_30_features):
+        column = chunk[feature]
+        if not pd.api.types.is_numeric_dtype(column):
+            column = pd.to_numeric(column, errors="coerce")
+        chunk[feature] = column.astype("float64")
+    return chunk
+
+
+def score_file(source, file_type, out, chunk_size=CHUNK_SIZE, on_progress=None, store=None, model=None,
+               validate=False):
+    """Score every row of ``source`` and write results as CSV to ``out``.
+
+    The output holds the source row number, any non-feature columns (such as
+    application ids) passed through unchanged, and the score columns; a
+    passthrough column named like an output column is written as
+    ``input_<name>``.
+    If an ``ApplicationStore`` is given, every row is also recorded there and
+    its id added as an ``application_id`` column. ``model`` is a
+    ``lending.models`` model, or ``None`` for the heuristic. With
+    ``validate``, every row is checked by ``lending.validation`` and
+    ``valid`` and ``errors`` columns are added. Values that aren't numbers
+    are scored as missing either way. Returns the number of rows scored.
+    """
+    columns = read_columns(source, file_type)
+    missing = missing_columns(columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    passthrough = [column for column in columns if column not in top_30_features]
+    output_names = passthrough_names(passthrough)
+    # Models, the store and validation need the full feature vector, not just the
+    # features the heuristic reads
+    features = SCORED_FEATURES if store is None and model is None and not validate else top_30_features
+    rows = 0
+    for chunk, progress in iter_chunks(source, file_type, passthrough + features, chunk_size,
+                                         typed=not validate):
+        values = None
+        if validate:
+            values, not_numeric = VALIDATOR.matrix(chunk)
+            checked = VALIDATOR.check(values, not_numeric)
+        scores = score_batch(chunk if values is None else values, model)
+        result = scores.to_frame()
+        if validate:
+            result.insert(0, "valid", checked.valid)
+            result.insert(1, "errors", checked.messages())
+        result.insert(0, "row", range(rows, rows + len(chunk)))
+        for i, (column, name) in enumerate(zip(passthrough, output_names)):
+            result.insert(i + 1, name, chunk[column].to_numpy())
+        if store is not None:
+            if values is None:
+                values = chunk[top_30_features].to_numpy(dtype="float64")
+            first_id = store.add_many(values, scores, model=model)
+            result.insert(1, "application_id", range(first_id, first_id + len(chunk)))
+        result.to_csv(out, header=rows == 0, index=False)
+        rows += len(chunk)
+        if on_progress is not None:
+            on_progress(progress, rows)
+    return rows
+
+
+def main(argv=None):
+    from lending.models import model_registry
+
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet applications file in chunks.")
+    parser.add_argument("source", help="CSV or Parquet file with the top 30 feature columns")
+    parser.add_argument("out", help="CSV file to write the scores to")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--validate", action="store_true", help="add valid and errors columns")
+    parser.add_argument("--record", action="store_true", help="record every decision in the application store")
+    args = parser.parse_args(argv)
+
+    store = None
+    if args.record:
+        from lending.store import application_store as store
+    with open(args.source, "rb") as source, open(args.out, "w", newline="") as out:
+        rows = score_file(source, file_type_for(args.source), out, args.chunk_size, store=store,
+                          model=model_registry.active(), validate=args.validate)
+    print(f"Scored {rows:,} applications into {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""Gauge, what-if and portfolio figures for the dashboard pages.
+
+The gauge specs (axis, steps, colors, layout) never change between renders,
+so they are built once as plain Plotly JSON dicts. Each render only patches
+the gauge value and threshold into a shallow copy, which can be serialized
+directly with ``json.dumps`` or turned into a ``go.Figure``. Figures are
+cached per distinct value, so Plotly's property validation runs at most once
+per gauge reading.
+"""
+import io
+import json
+import math
+
+from lending.cache import LRUCache
+from lending.metrics import registry
+from lending.scoring import ELIGIBILITY, ELIGIBILITY_CUTS, RISK_LEVEL_CUTS, RISK_LEVEL_GAUGE_COLORS
+
+_MARGIN = {"l": 20, "r": 20, "b": 20}
+
+
+def _risk_level_steps():
+    # Gauge steps follow the risk level bands of the scoring rule table,
+    # in the gauge's own colors
+    edges = [0, *(round(float(cut) * 100, 6) for cut in RISK_LEVEL_CUTS), 100]
+    if len(RISK_LEVEL_GAUGE_COLORS) != len(edges) - 1:
+        raise ValueError(f"expected {len(edges) - 1} gauge colors, got {len(RISK_LEVEL_GAUGE_COLORS)}")
+    return [{"range": [lo, hi], "color": color} for lo, hi, color in zip(edges, edges[1:], RISK_LEVEL_GAUGE_COLORS)]
+
+
+DEFAULT_PROB_GAUGE = {
+    "data": [{
+        "type": "indicator",
+        "mode": "gauge+number",
+        "value": 0,
+        "domain": {"x": [0, 1], "y": [0, 1]},
+        "number": {"suffix": "%", "font": {"size": 24}},
+        "gauge": {
+            "axis": {"range": [0, 100], "tickwidth": 1, "tickcolor": "darkblue"},
+            "bar": {"color": "darkblue"},
+            "steps": _risk_level_steps(),
+            "threshold": {"line": {"color": "red", "width": 4}, "thickness": 0.75, "value": 0},
+        },
+    }],
+    "layout": {"height": 200, "margin": dict(_MARGIN, t=30)},
+}
+
+CONFIDENCE_GAUGE = {
+    "data": [{
+        "type": "indicator",
+        "mode": "number+gauge",
+        "value": 0,
+        "domain": {"x": [0, 1], "y": [0, 1]},
+        "title": {"text": "Model Confidence"},
+        "gauge": {
+            "axis": {"range": [None, 100]},
+            "bar": {"color": "#1E88E5"},
+            "steps": [
+                {"range": [0, 50], "color": "lightgray"},
+                {"range": [50, 80], "color": "gray"},
+                {"range": [80, 100], "color": "darkgray"},
+            ],
+            "threshold": {"line": {"color": "red", "width": 4}, "thickness": 0.75, "value": 0},
+        },
+    }],
+    "layout": {"height": 200, "margin": dict(_MARGIN, t=70)},
+}
+
+GAUGES = {
+    "default_prob": DEFAULT_PROB_GAUGE,
+    "confidence": CONFIDENCE_GAUGE,
+}
+
+figure_cache = LRUCache(maxsize=512)
+registry.gauge("lending_figure_cache_hits", "Gauge figure cache hits", lambda: figure_cache.hits)
+registry.gauge("lending_figure_cache_misses", "Gauge figure cache misses", lambda: figure_cache.misses)
+
+# What-if figures hold whole sweep grids, so far fewer are kept
+sweep_cache = LRUCache(maxsize=32)
+registry.gauge("lending_sweep_cache_hits", "What-if figure cache hits", lambda: sweep_cache.hits)
+registry.gauge("lending_sweep_cache_misses", "What-if figure cache misses", lambda: sweep_cache.misses)
+
+
+def gauge_spec(name, value):
+    """Return the ``name`` gauge spec with its value and threshold set to ``value``.
+
+    Only the patched path is copied; everything else is shared with the
+    template and must not be modified.
+    """
+    spec = GAUGES[name]
+    trace = spec["data"][0]
+    gauge = trace["gauge"]
+    threshold = dict(gauge["threshold"], value=value)
+    return {"data": [dict(trace, value=value, gauge=dict(gauge, threshold=threshold))], "layout": spec["layout"]}
+
+
+def gauge_json(name, value):
+    """Serialize a gauge straight to Plotly JSON, skipping figure validation."""
+    return json.dumps(gauge_spec(name, value))
+
+
+def gauge_figure(name, value):
+    """Return a ``go.Figure`` for the gauge, built once per distinct value.
+
+    The figure is shared between sessions, so callers must not modify it.
+    """
+    def build():
+        import plotly.graph_objects as go
+
+        return go.Figure(gauge_spec(name, value))
+
+    return figure_cache.get_or_compute((name, value), build)
+
+
+def default_prob_figure(default_prob):
+    return gauge_figure("default_prob", default_prob * 100)
+
+
+def confidence_figure(confidence):
+    return gauge_figure("confidence", confidence)
+
+
+# Gauge images for reports, drawn with Pillow from the same specs
+GAUGE_IMAGE_SIZE = (480, 260)
+
+image_cache = LRUCache(maxsize=1024)
+registry.gauge("lending_gauge_image_cache_hits", "Gauge image cache hits", lambda: image_cache.hits)
+registry.gauge("lending_gauge_image_cache_misses", "Gauge image cache misses", lambda: image_cache.misses)
+
+
+def _draw_gauge(name, value):
+    from PIL import Image, ImageDraw
+
+    gauge = GAUGES[name]["data"][0]["gauge"]
+    lo, hi = gauge["axis"]["range"]
+    lo = 0 if lo is None else lo
+    width, height = GAUGE_IMAGE_SIZE
+    image = Image.new("RGB", GAUGE_IMAGE_SIZE, "white")
+    draw = ImageDraw.Draw(image)
+    radius = min(width / 2, height) - 20
+    cx, cy = width / 2, height - 10
+    box = [cx - radius, cy - radius, cx + radius, cy + radius]
+
+    def angle(v):
+        # Pillow angles run clockwise from 3 o'clock; the gauge spans 180-360
+        return 180 + 180 * (min(max(v, lo), hi) - lo) / (hi - lo)
+
+    ring = int(radius * 0.35)
+    for step in gauge["steps"]:
+        draw.arc(box, angle(step["range"][0]), angle(step["range"][1]), fill=step["color"], width=ring)
+    inset = ring * 0.35
+    bar_box = [box[0] + inset, box[1] + inset, box[2] - inset, box[3] - inset]
+    if value > lo:
+        draw.arc(bar_box, 180, angle(value), fill=gauge["bar"]["color"], width=int(ring * 0.3))
+
+    theta = math.radians(angle(value))
+    inner, outer = radius - ring, radius
+    draw.line([cx + inner * math.cos(theta), cy + inner * math.sin(theta),
+               cx + outer * math.cos(theta), cy + outer * math.sin(theta)],
+              fill=gauge["threshold"]["line"]["color"], width=gauge["threshold"]["line"]["width"] * 2)
+    return image
+
+
+def gauge_image(name, value, format="PNG"):
+    """Encoded image of the gauge (``"PNG"`` or ``"JPEG"``), drawn once per distinct value.
+
+    Only the dial is drawn; reports print the value next to it as text.
+    """
+    def build():
+        buffer = io.BytesIO()
+        _draw_gauge(name, value).save(buffer, format=format, quality=90)
+        return buffer.getvalue()
+
+    return image_cache.get_or_compute((name, value, format), build)
+
+
+# Eligibility boundaries drawn over what-if sweeps: (default probability, label
+# of the band above it, color)
+ELIGIBILITY_BOUNDARIES = [
+    (float(cut), label, color) for cut, (label, color, _) in zip(ELIGIBILITY_CUTS, ELIGIBILITY[1:])
+]
+
+
+def sweep_curve_figure(sweep, current=None):
+    """Line chart of default probability across a 1-D sweep.
+
+    ``current`` marks the applicant's own value of the swept feature.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scatter(x=sweep.values, y=sweep.default_prob * 100, mode="lines",
+                               line={"color": "darkblue"}, name="Default probability"))
+    for prob, label, color in ELIGIBILITY_BOUNDARIES:
+        fig.add_hline(y=prob * 100, line_dash="dash", line_color=color,
+                      annotation_text=label, annotation_position="top left")
+    if current is not None:
+        fig.add_vline(x=current, line_color="gray", annotation_text="Current")
+    fig.update_layout(height=350, margin=dict(_MARGIN, t=30), xaxis_title=sweep.feature,
+                      yaxis_title="Default probability (%)", yaxis_range=[0, 100])
+    return fig
+
+
+def sweep_heatmap_figure(sweep, current=None):
+    """Heatmap of default probability across a 2-D sweep.
+
+    Contours mark the eligibility boundaries; ``current`` is the applicant's
+    own ``(x, y)`` point.
+    """
+    import plotly.graph_objects as go
+
+    z = sweep.default_prob * 100
+    fig = go.Figure(go.Heatmap(x=sweep.x, y=sweep.y, z=z, zmin=0, zmax=100,
+                               colorscale=[[0, "#4CAF50"], [0.35, "#FFC107"], [1, "#F44336"]],
+                               colorbar={"title": "Default %"}))
+    for prob, label, color in ELIGIBILITY_BOUNDARIES:
+        fig.add_trace(go.Contour(x=sweep.x, y=sweep.y, z=z, showscale=False, name=label,
+                                 contours={"coloring": "none", "start": prob * 100, "end": prob * 100, "size": 1},
+                                 line={"color": color, "width": 2}, hoverinfo="skip"))
+    if current is not None:
+        fig.add_trace(go.Scatter(x=[current[0]], y=[current[1]], mode="markers", name="Current",
+                                 marker={"color": "white", "size": 10, "line": {"color": "black", "width": 2}}))
+    fig.update_layout(height=450, margin=dict(_MARGIN, t=30), xaxis_title=sweep.feature_x,
+                      yaxis_title=sweep.feature_y, showlegend=False)
+    return fig
+
+
+def what_if_figure(features, applicant, points, model):
+    """Curve (one feature) or heatmap (two) of ``applicant`` with ``features`` swept.
+
+    Sweeps and figures are built once per applicant, features, grid size and
+    model, and shared between sessions, so callers must not modify them.
+    """
+    def build():
+        from lending.sweep import sweep_1d, sweep_2d
+
+        if len(features) == 1:
+            feature = features[0]
+            return sweep_curve_figure(sweep_1d(feature, applicant, points, model), current=applicant[feature])
+        feature_x, feature_y = features
+        sweep = sweep_2d(feature_x, feature_y, applicant, points, model)
+        return sweep_heatmap_figure(sweep, current=(applicant[feature_x], applicant[feature_y]))
+
+    return sweep_cache.get_or_compute((applicant.digest(), tuple(features), points, model.cache_key), build)
+
+
+# Portfolio charts; all are drawn from PortfolioSummary tables, never raw rows
+
+def band_bar_figure(table, title):
+    """Bar chart of a ``PortfolioSummary.band_table``."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(x=table["band"], y=table["count"], marker_color=table["color"],
+                           text=[f"{share:.1%}" for share in table["share"]], textposition="auto"))
+    fig.update_layout(title=title, height=320, margin=dict(_MARGIN, t=50), yaxis_title="Applications")
+    return fig
+
+
+def prob_histogram_figure(edges, counts, quantiles=None):
+    """Default probability histogram from precomputed bin counts.
+
+    ``quantiles`` maps labels such as ``"p50"`` to default probabilities to
+    mark on the chart.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) * 50, y=counts, width=(edges[1] - edges[0]) * 100,
+                           marker_color="darkblue"))
+    for label, value in (quantiles or {}).items():
+        fig.add_vline(x=value * 100, line_dash="dot", line_color="gray",
+                      annotation_text=label, annotation_position="top")
+    for prob, label, color in ELIGIBILITY_BOUNDARIES:
+        fig.add_vline(x=prob * 100, line_dash="dash", line_color=color)
+    fig.update_layout(title="Default Probability Distribution", height=320, margin=dict(_MARGIN, t=50),
+                      xaxis_title="Default probability (%)", yaxis_title="Applications", bargap=0)
+    return fig
+
+
+def feature_breakdown_figure(table, feature):
+    """Applications per bin of ``feature`` with their mean default probability, from ``feature_table``."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=table["bin_center"], y=table["count"], name="Applications",
+                         marker_color="lightgray"))
+    fig.add_trace(go.Scatter(x=table["bin_center"], y=table["mean_default_prob"] * 100,
+                             name="Mean default probability (%)", mode="lines+markers",
+                             line={"color": "darkblue"}, yaxis="y2"))
+    fig.add_trace(go.Scatter(x=table["bin_center"], y=table["decline_rate"] * 100,
+                             name="Declined (%)", mode="lines", line={"color": "#F44336", "dash": "dash"},
+                             yaxis="y2"))
+    fig.update_layout(
+        height=380, margin=dict(_MARGIN, t=30), xaxis_title=feature,
+        yaxis={"title": "Applications"},
+        yaxis2={"title": "%", "overlaying": "y", "side": "right", "range": [0, 100]},
+        legend={"orientation": "h", "y": -0.25},
+    )
+    return fig
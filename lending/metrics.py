@@ -0,0 +1,211 @@
+"""Lightweight timing instrumentation with Prometheus text export.
+
+Wrap a hot-path stage in ``timed("stage")`` (a context manager or a
+decorator). Every observation goes into the process-wide ``registry`` as a
+``lending_stage_seconds`` histogram, which ``render_prometheus()`` formats in
+the Prometheus text exposition format and ``export_prometheus()`` writes to a
+file, e.g. for the node_exporter textfile collector.
+
+Timings are also collected per run: ``start_run()`` begins a new list for
+the current thread, and the dashboard uses it for its developer timing
+panel.
+"""
+import contextvars
+import os
+import tempfile
+import threading
+import time
+from contextlib import ContextDecorator
+
+# Histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# File the dashboard exports metrics to, if set
+METRICS_FILE = os.environ.get("LENDING_METRICS_FILE")
+
+# Minimum seconds between two exports to METRICS_FILE
+EXPORT_INTERVAL = 10.0
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            for bound, count in zip(self.buckets, values):
+                le = (("le", repr(bound)),)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, (('le', '+Inf'),))} {values[-2]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {values[-2]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(values[-1])}"
+
+
+class Gauge:
+    """A gauge whose value is read from a callback when metrics are rendered."""
+    kind = "gauge"
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self._read = read
+
+    def samples(self):
+        yield f"{self.name} {_format_value(self._read())}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help, labelnames, buckets)
+
+    def gauge(self, name, help, read):
+        return self._get_or_create(Gauge, name, help, read)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "lending_stage_seconds", "Time spent in each instrumented stage", labelnames=("stage",)
+)
+STAGE_ERRORS = registry.counter(
+    "lending_stage_errors_total", "Instrumented stages that raised an exception", labelnames=("stage",)
+)
+
+_current_run = contextvars.ContextVar("lending_current_run", default=None)
+
+
+def start_run():
+    """Start collecting ``(stage, seconds)`` timings for the current thread's run."""
+    run = []
+    _current_run.set(run)
+    return run
+
+
+class timed(ContextDecorator):
+    """Time a block or function call as ``stage``."""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self._starts = threading.local()
+
+    def __enter__(self):
+        stack = getattr(self._starts, "stack", None)
+        if stack is None:
+            stack = self._starts.stack = []
+        stack.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._starts.stack.pop()
+        STAGE_SECONDS.observe(elapsed, stage=self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.stage)
+        run = _current_run.get()
+        if run is not None:
+            run.append((self.stage, elapsed))
+        return False
+
+
+def render_prometheus():
+    return registry.render()
+
+
+_last_export = 0.0
+_export_lock = threading.Lock()
+
+
+def export_prometheus(path=METRICS_FILE, min_interval=EXPORT_INTERVAL):
+    """Write the metrics to ``path`` atomically, at most once per ``min_interval`` seconds."""
+    global _last_export
+    if not path:
+        return False
+    now = time.monotonic()
+    with _export_lock:
+        if now - _last_export < min_interval:
+            return False
+        _last_export = now
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+    return True
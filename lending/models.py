@@ -0,0 +1,309 @@
+"""Scoring model artifacts and the process-wide model registry.
+
+A model predicts the default probability from the ``(n, 30)`` feature matrix
+in ``top_30_features`` order. The risk level, eligibility and key risk
+factors are then derived from it by the rule table in ``lending.scoring``.
+
+Model versions live side by side in a local directory (``models/``, or
+``LENDING_MODEL_DIR``), one artifact per version, named ``<version>.npz`` or
+``<version>.pkl``:
+
+- ``.npz``: NumPy logistic-regression coefficients, written with
+  ``save_linear_model``: ``coef`` and ``intercept``, optionally ``features``
+  (the column order of ``coef``, mapped onto ``top_30_features`` by name) and
+  ``mean``/``scale`` for standardization,
+- ``.pkl``: a pickled scikit-learn-style estimator with ``predict_proba``
+  (the positive class column is used) or ``predict``. If it has
+  ``feature_names_in_``, its columns are mapped by name. Pickles run code
+  when loaded, so only put trusted artifacts in the directory.
+
+The ``ACTIVE`` file in the same directory names the version to score with,
+and the optional ``CHALLENGER`` file a version to shadow it (see
+``lending.shadow``). The registry re-reads them (and reloads replaced
+artifacts) at most every ``RELOAD_INTERVAL`` seconds, so versions can be
+swapped on a running server with ``python -m lending.models activate
+<version>`` or ``challenge <version>``. Without an ``ACTIVE`` file, or if the
+active artifact fails to load, the rule-table heuristic is used.
+"""
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from lending.schema import feature_index, top_30_features
+from lending.scoring import HEURISTIC_VERSION, RULES, SCORED_FEATURES
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = Path(os.environ.get("LENDING_MODEL_DIR", Path(__file__).resolve().parent.parent / "models"))
+ACTIVE_FILE = "ACTIVE"
+CHALLENGER_FILE = "CHALLENGER"
+MODEL_SUFFIXES = (".npz", ".pkl")
+
+# Seconds between checks of the ACTIVE file and the artifacts' mtimes
+RELOAD_INTERVAL = 2.0
+
+
+def _column_order(features):
+    """Indices into ``top_30_features`` for an artifact's feature names."""
+    features = [str(feature) for feature in features]
+    unknown = [feature for feature in features if feature not in feature_index]
+    if unknown:
+        raise ValueError(f"model uses unknown features: {', '.join(unknown)}")
+    return np.array([feature_index[feature] for feature in features])
+
+
+class HeuristicModel:
+    """The rule-table heuristic, as a model."""
+
+    version = HEURISTIC_VERSION
+    cache_key = HEURISTIC_VERSION
+
+    def predict(self, X):
+        columns = {feature: X[:, feature_index[feature]] for feature in SCORED_FEATURES}
+        return RULES.default_prob(columns, len(X))
+
+
+class LinearModel:
+    """Logistic regression over standardized features."""
+
+    def __init__(self, version, coef, intercept, features=top_30_features, mean=None, scale=None,
+                 cache_key=None):
+        self.version = version
+        self.cache_key = cache_key or version
+        self.columns = _column_order(features)
+        self.coef = np.asarray(coef, dtype=np.float64).reshape(len(self.columns))
+        self.intercept = float(intercept)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+
+    @classmethod
+    def load(cls, path, version, cache_key=None):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                version,
+                data["coef"],
+                data["intercept"],
+                features=data["features"] if "features" in data else top_30_features,
+                mean=data["mean"] if "mean" in data else None,
+                scale=data["scale"] if "scale" in data else None,
+                cache_key=cache_key,
+            )
+
+    def predict(self, X):
+        X = X[:, self.columns]
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        return 1.0 / (1.0 + np.exp(-(X @ self.coef + self.intercept)))
+
+
+class EstimatorModel:
+    """A scikit-learn-style estimator."""
+
+    def __init__(self, version, estimator, cache_key=None):
+        self.version = version
+        self.cache_key = cache_key or version
+        self.estimator = estimator
+        names = getattr(estimator, "feature_names_in_", None)
+        self.feature_names = None if names is None else [str(name) for name in names]
+        self.columns = None if names is None else _column_order(names)
+
+    @classmethod
+    def load(cls, path, version, cache_key=None):
+        with open(path, "rb") as f:
+            return cls(version, pickle.load(f), cache_key=cache_key)
+
+    def predict(self, X):
+        if self.columns is not None:
+            import pandas as pd
+
+            # Estimators fitted on a DataFrame expect the same column names
+            X = pd.DataFrame(X[:, self.columns], columns=self.feature_names)
+        if hasattr(self.estimator, "predict_proba"):
+            return np.asarray(self.estimator.predict_proba(X))[:, 1]
+        return np.asarray(self.estimator.predict(X))
+
+
+class _Pointer(NamedTuple):
+    model: object
+    checked: float  # time.monotonic() of the last check
+    failed: str  # version that last failed to load, if any
+
+
+_LOADERS = {".npz": LinearModel.load, ".pkl": EstimatorModel.load}
+
+heuristic_model = HeuristicModel()
+
+
+def save_linear_model(path, coef, intercept, features=top_30_features, mean=None, scale=None):
+    """Write a ``.npz`` logistic-regression artifact for the registry."""
+    arrays = {"coef": np.asarray(coef, dtype=np.float64), "intercept": np.float64(intercept),
+              "features": np.asarray(features, dtype=str)}
+    if mean is not None:
+        arrays["mean"] = np.asarray(mean, dtype=np.float64)
+    if scale is not None:
+        arrays["scale"] = np.asarray(scale, dtype=np.float64)
+    np.savez(path, **arrays)
+
+
+class ModelRegistry:
+    """Loads model versions from ``directory`` once each and tracks the active one.
+
+    Safe to share between threads. Loaded models are kept until their
+    artifact changes, so every version can be scored side by side.
+    """
+
+    def __init__(self, directory=MODEL_DIR, reload_interval=RELOAD_INTERVAL):
+        self.directory = Path(directory)
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._models = {}  # version -> (mtime_ns, model)
+        self._pointers = {}  # ACTIVE_FILE / CHALLENGER_FILE -> _Pointer
+
+    def _artifact(self, version):
+        for suffix in MODEL_SUFFIXES:
+            path = self.directory / f"{version}{suffix}"
+            if path.is_file():
+                return path
+        return None
+
+    def versions(self):
+        """Available versions, the heuristic first."""
+        found = set()
+        if self.directory.is_dir():
+            found = {path.stem for path in self.directory.iterdir() if path.suffix in MODEL_SUFFIXES}
+        return [HEURISTIC_VERSION] + sorted(found - {HEURISTIC_VERSION})
+
+    def get(self, version):
+        """Return the model for ``version``, loading it if it is new or its artifact changed.
+
+        Raises ``KeyError`` for unknown versions.
+        """
+        if version == HEURISTIC_VERSION:
+            return heuristic_model
+        path = self._artifact(version)
+        if path is None:
+            raise KeyError(f"no artifact for model version {version!r} in {self.directory}")
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            entry = self._models.get(version)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+        # Load outside the lock; a concurrent load of the same version is harmless
+        model = _LOADERS[path.suffix](path, version, cache_key=(version, mtime))
+        with self._lock:
+            self._models[version] = (mtime, model)
+        logger.info("Loaded model %s from %s", version, path)
+        return model
+
+    def _read_pointer(self, name):
+        try:
+            return (self.directory / name).read_text().strip() or None
+        except OSError:
+            return None
+
+    def _resolve(self, name, default):
+        # The model a pointer file names, re-checked at most every reload_interval
+        now = time.monotonic()
+        pointer = self._pointers.get(name)
+        if pointer is not None and now - pointer.checked < self.reload_interval:
+            return pointer.model
+        version = self._read_pointer(name)
+        model, failed = default, None
+        if version is not None:
+            try:
+                model = self.get(version)
+            except Exception:
+                # Logged once per broken version rather than on every check
+                if pointer is None or pointer.failed != version:
+                    logger.exception("Could not load %s model %s", name.lower(), version)
+                failed = version
+        self._pointers[name] = _Pointer(model, now, failed)
+        return model
+
+    def _write_pointer(self, name, version):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if version is None:
+            (self.directory / name).unlink(missing_ok=True)
+        else:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{version}\n")
+            os.replace(tmp, self.directory / name)
+        self._pointers.pop(name, None)
+
+    def active_version(self):
+        return self._read_pointer(ACTIVE_FILE) or HEURISTIC_VERSION
+
+    def challenger_version(self):
+        return self._read_pointer(CHALLENGER_FILE)
+
+    def active(self):
+        """The active model; the heuristic if none is set or it can't be loaded."""
+        return self._resolve(ACTIVE_FILE, heuristic_model)
+
+    def challenger(self):
+        """The model to shadow the active one with, or ``None``."""
+        return self._resolve(CHALLENGER_FILE, None)
+
+    def activate(self, version):
+        """Make ``version`` the active model for every process using this directory."""
+        self.get(version)  # fail early on unknown or broken artifacts
+        self._write_pointer(ACTIVE_FILE, version)
+
+    def challenge(self, version):
+        """Shadow the active model with ``version``; ``None`` stops shadow scoring."""
+        if version is not None:
+            self.get(version)
+        self._write_pointer(CHALLENGER_FILE, version)
+
+
+model_registry = ModelRegistry()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List or activate scoring model versions.")
+    parser.add_argument("--dir", default=MODEL_DIR, help="model directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the available versions")
+    activate = commands.add_parser("activate", help="make a version the active model")
+    activate.add_argument("version")
+    challenge = commands.add_parser("challenge", help="shadow the active model with a version")
+    challenge.add_argument("version", nargs="?", help="leave out to stop shadow scoring")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.dir)
+    if args.command == "list":
+        active, challenger = registry.active_version(), registry.challenger_version()
+        for version in registry.versions():
+            marker = "*" if version == active else "~" if version == challenger else " "
+            print(f"{marker} {version}")
+        return 0
+    try:
+        if args.command == "activate":
+            registry.activate(args.version)
+        else:
+            registry.challenge(args.version)
+    except (KeyError, ValueError, OSError) as e:
+        print(f"Could not {args.command} {args.version}: {e}", file=sys.stderr)
+        return 1
+    if args.command == "activate":
+        print(f"Active model: {args.version}")
+    else:
+        print(f"Challenger model: {args.version or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Multi-process batch scoring for full-book rescoring.
+
+``score_parallel`` splits an ``(n, 30)`` feature array (columns in
+``top_30_features`` order) into shards of ``SHARD_SIZE`` rows and scores them
+in a ``ProcessPoolExecutor``. Rows are never pickled: the input is either a
+``.npy`` file, which every worker memory-maps itself, or copied once into a
+``multiprocessing.shared_memory`` block. Each worker writes its shard's
+scores straight into shared output arrays at the shard's offset, so the
+result comes back in input order however the shards finish.
+
+    python -m lending.parallel book.npy scores.npz --workers 32
+
+CSV and Parquet sources are read into memory first; for repeated runs over
+the same book, convert it to ``.npy`` once and score that.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+import numpy as np
+
+from lending.schema import top_30_features
+from lending.scoring import RISK_FACTORS, BatchScore, score_batch
+
+# Worker processes; defaults to every core
+SCORE_WORKERS = int(os.environ.get("LENDING_SCORE_WORKERS", os.cpu_count() or 1))
+
+# Rows per task. Large enough to amortize task overhead, small enough that
+# shards outnumber workers and the load evens out
+SHARD_SIZE = 250_000
+
+# BatchScore fields: (dtype, shape of one row)
+_OUTPUTS = {
+    "default_prob": (np.float64, ()),
+    "risk_level": (np.int8, ()),
+    "eligibility": (np.int8, ()),
+    "risk_factors": (np.bool_, (len(RISK_FACTORS),)),
+    "confidence": (np.int64, ()),
+}
+
+
+class _SharedArray(NamedTuple):
+    # Enough to attach to a shared block as an array from another process
+    name: str
+    shape: tuple
+    dtype: str
+
+    @classmethod
+    def create(cls, shape, dtype, stack):
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shm = SharedMemory(create=True, size=size)
+        stack.callback(shm.unlink)
+        stack.callback(shm.close)
+        spec = cls(shm.name, tuple(shape), np.dtype(dtype).str)
+        return spec, spec.view(shm)
+
+    def attach(self):
+        shm = SharedMemory(name=self.name)
+        return shm, self.view(shm)
+
+    def view(self, shm):
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(source, outputs, model):
+    handles = []
+    if isinstance(source, _SharedArray):
+        shm, features = source.attach()
+        handles.append(shm)
+    else:
+        features = np.load(source, mmap_mode="r")
+    arrays = {}
+    for field, spec in outputs.items():
+        shm, arrays[field] = spec.attach()
+        handles.append(shm)
+    _worker.update(features=features, outputs=arrays, model=model, handles=handles)
+
+
+def _score_into(outputs, features, start, stop, model):
+    scores = score_batch(np.asarray(features[start:stop], dtype=np.float64), model)
+    for field, out in outputs.items():
+        out[start:stop] = getattr(scores, field)
+    return stop - start
+
+
+def _score_shard(start, stop):
+    return _score_into(_worker["outputs"], _worker["features"], start, stop, _worker["model"])
+
+
+def _check_shape(features):
+    if features.ndim != 2 or features.shape[1] != len(top_30_features):
+        raise ValueError(
+            f"expected a 2-D array with {len(top_30_features)} columns, got shape {features.shape}"
+        )
+
+
+def score_parallel(features, workers=SCORE_WORKERS, shard_size=SHARD_SIZE, model=None, on_progress=None):
+    """Score ``features`` on ``workers`` processes and return one ``BatchScore``.
+
+    ``features`` is an ``(n, 30)`` array or the path of a ``.npy`` file
+    holding one. Results are identical to ``score_batch(features, model)``;
+    small inputs, or ``workers=1``, are scored in this process, a shard at a
+    time. ``on_progress(rows_done)`` is called as shards complete.
+    """
+    path = None
+    if isinstance(features, (str, os.PathLike)):
+        path = os.fspath(features)
+        features = np.load(path, mmap_mode="r")
+    _check_shape(features)
+    n = len(features)
+    shards = [(start, min(start + shard_size, n)) for start in range(0, n, shard_size)]
+    if workers <= 1 or len(shards) <= 1:
+        results = {field: np.empty((n,) + row_shape, dtype) for field, (dtype, row_shape) in _OUTPUTS.items()}
+        done = 0
+        for start, stop in shards:
+            done += _score_into(results, features, start, stop, model)
+            if on_progress is not None:
+                on_progress(done)
+        return BatchScore(**results)
+
+    with ExitStack() as stack:
+        if path is None:
+            source, shared = _SharedArray.create(features.shape, np.float64, stack)
+            shared[:] = features
+        else:
+            source = path
+        outputs, results = {}, {}
+        for field, (dtype, row_shape) in _OUTPUTS.items():
+            outputs[field], results[field] = _SharedArray.create((n,) + row_shape, dtype, stack)
+
+        # Spawned rather than forked: the dashboard and service run threads
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)), mp_context=get_context("spawn"),
+            initializer=_init_worker, initargs=(source, outputs, model),
+        )
+        with pool:
+            futures = [pool.submit(_score_shard, start, stop) for start, stop in shards]
+            done = 0
+            for future in as_completed(futures):
+                done += future.result()
+                if on_progress is not None:
+                    on_progress(done)
+        # Copied out before the shared blocks are released
+        return BatchScore(**{field: array.copy() for field, array in results.items()})
+
+
+def read_features(source, file_type):
+    """Read the top 30 feature columns of a CSV or Parquet file into an ``(n, 30)`` array."""
+    from lending.bulk import iter_chunks, missing_columns, read_columns
+
+    missing = missing_columns(read_columns(source, file_type))
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    chunks = [chunk[top_30_features].to_numpy(dtype=np.float64)
+              for chunk, _ in iter_chunks(source, file_type, top_30_features)]
+    if not chunks:
+        return np.empty((0, len(top_30_features)))
+    return np.concatenate(chunks)
+
+
+def main(argv=None):
+    from lending.bulk import file_type_for
+
+    parser = argparse.ArgumentParser(description="Score a whole book of applications on every core.")
+    parser.add_argument("source", help=".npy array, or CSV or Parquet file, with the top 30 feature columns")
+    parser.add_argument("out", help="scores to write: .npz arrays, or .csv")
+    parser.add_argument("--workers", type=int, default=SCORE_WORKERS)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.source.endswith(".npy"):
+        features = args.source
+    else:
+        with open(args.source, "rb") as source:
+            features = read_features(source, file_type_for(args.source))
+    scores = score_parallel(features, args.workers, args.shard_size)
+    if args.out.endswith(".csv"):
+        scores.to_frame().to_csv(args.out, index_label="row")
+    else:
+        np.savez(args.out, **scores._asdict())
+    print(f"Scored {len(scores):,} applications into {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""Memory-mapped columnar store for applicant populations and their scores.
+
+A population is a directory with one raw column file per feature in
+``top_30_features`` and, optionally, per score, plus a small JSON header:
+
+    book.pop/
+        header.json
+        CREDIT_SCORE_AVG_CALC.bin
+        ...
+        default_prob.bin  risk_level.bin  eligibility.bin  risk_factors.bin  confidence.bin
+
+The header records the row count, every column's dtype and row shape, the
+label lists of the score columns, and the ``feature_input_config`` ranges the
+features were collected under. Opening a population reads only the header;
+each column is memory-mapped on first access, so a 50M-row population opens
+instantly, a job that reads three columns touches only those three files,
+and every process that opens the same population shares one copy of it in
+the OS page cache.
+
+A ``Population`` (or a row slice of one, ``population[start:stop]``) can be
+passed to ``score_batch`` and ``PortfolioSummary.update`` like a DataFrame.
+
+    python -m lending.population convert applications.parquet book.pop
+    python -m lending.population info book.pop
+
+A population is written into a temporary sibling directory and moved into
+place when it is complete, so rewriting one never truncates files that
+another process still has mapped; readers keep the old version until they
+reopen it. The dashboard only opens populations under ``POPULATION_ROOT``
+(``LENDING_POPULATION_ROOT``).
+
+Features are stored as float64 unless ``float32`` is asked for, which halves
+the size but rounds values to float32, so a value right at a rule's cut point
+may fall in the neighbouring band.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from lending.schema import feature_input_config, top_30_features
+from lending.scoring import ELIGIBILITY, RISK_FACTORS, RISK_LEVELS, BatchScore, score_batch
+
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+
+# Directory the dashboard lists populations from
+POPULATION_ROOT = Path(os.environ.get("LENDING_POPULATION_ROOT",
+                                      Path(__file__).resolve().parent.parent / "populations"))
+
+# Rows written or read per step when converting and summarizing
+CHUNK_SIZE = 1_000_000
+
+FEATURE_DTYPES = {"float64": "<f8", "float32": "<f4"}
+
+# Score columns: (dtype, row shape, labels)
+SCORE_COLUMNS = {
+    "default_prob": ("<f8", [], None),
+    "risk_level": ("|i1", [], [label for label, _ in RISK_LEVELS]),
+    "eligibility": ("|i1", [], [label for label, *_ in ELIGIBILITY]),
+    "risk_factors": ("|b1", [len(RISK_FACTORS)], list(RISK_FACTORS)),
+    "confidence": ("<i8", [], None),
+}
+
+
+class Population:
+    """A population on disk, opened read-only; see the module docstring.
+
+    ``population[name]`` is a column as a read-only memory-mapped array;
+    ``population[start:stop]`` is a view of a range of rows.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            header = json.loads((self.path / HEADER_FILE).read_text())
+        except FileNotFoundError:
+            raise ValueError(f"{self.path} is not a population (no {HEADER_FILE})") from None
+        if header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported population format {header.get('format')!r}")
+        self.header = header
+        self._specs = header["columns"]
+        self._maps = {}  # shared by every view of this population
+        self._start, self._stop = 0, header["rows"]
+
+    @property
+    def columns(self):
+        return list(self._specs)
+
+    @property
+    def features(self):
+        return [name for name, spec in self._specs.items() if spec["kind"] == "feature"]
+
+    @property
+    def has_scores(self):
+        return all(name in self._specs for name in SCORE_COLUMNS)
+
+    @property
+    def feature_ranges(self):
+        """The ``feature_input_config`` entries the population was written with."""
+        return {name: spec["range"] for name, spec in self._specs.items() if spec["kind"] == "feature"}
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("population views must be contiguous")
+            view = object.__new__(Population)
+            view.__dict__.update(self.__dict__)
+            view._start, view._stop = self._start + start, self._start + max(start, stop)
+            return view
+        return self._map(key)[self._start:self._stop]
+
+    def _map(self, name):
+        column = self._maps.get(name)
+        if column is None:
+            spec = self._specs[name]
+            shape = (self.header["rows"],) + tuple(spec["shape"])
+            if self.header["rows"] == 0:
+                column = np.empty(shape, dtype=spec["dtype"])  # np.memmap can't map empty files
+            else:
+                column = np.memmap(self.path / f"{name}.bin", dtype=spec["dtype"], mode="r", shape=shape)
+            self._maps[name] = column
+        return column
+
+    def feature_matrix(self, features=top_30_features):
+        """The selected feature columns as one ``(n, k)`` float64 array (a copy)."""
+        out = np.empty((len(self), len(features)))
+        for j, feature in enumerate(features):
+            out[:, j] = self[feature]
+        return out
+
+    def scores(self):
+        """The stored scores as a ``BatchScore`` of memory-mapped arrays, or ``None``."""
+        if not self.has_scores:
+            return None
+        return BatchScore(**{name: self[name] for name in SCORE_COLUMNS})
+
+    def iter_chunks(self, chunk_size=CHUNK_SIZE):
+        """Yield ``(view, progress)`` pairs of consecutive row ranges."""
+        n = len(self)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            yield self[start:stop], stop / n
+
+
+def list_populations(root=POPULATION_ROOT):
+    """Names of the populations directly under ``root``."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    return sorted(entry.name for entry in root.iterdir() if (entry / HEADER_FILE).is_file())
+
+
+class PopulationWriter:
+    """Writes a population chunk by chunk; use as a context manager.
+
+    Files are written to a temporary directory next to ``path``, which
+    replaces ``path`` on ``close``; a population that was not finished is
+    removed and never seen at ``path``.
+    """
+
+    def __init__(self, path, dtype="float64", scores=True):
+        if dtype not in FEATURE_DTYPES:
+            raise ValueError(f"dtype must be one of {', '.join(FEATURE_DTYPES)}, not {dtype!r}")
+        self.path = Path(path)
+        self.dtype = FEATURE_DTYPES[dtype]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = Path(tempfile.mkdtemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"))
+        self.columns = {
+            feature: {"kind": "feature", "dtype": self.dtype, "shape": [], "range": feature_input_config[feature]}
+            for feature in top_30_features
+        }
+        if scores:
+            for name, (score_dtype, shape, labels) in SCORE_COLUMNS.items():
+                self.columns[name] = {"kind": "score", "dtype": score_dtype, "shape": shape}
+                if labels is not None:
+                    self.columns[name]["labels"] = labels
+        self.rows = 0
+        self._files = {name: open(self._tmp / f"{name}.bin", "wb") for name in self.columns}
+
+    def append(self, features, scores=None):
+        """Add an ``(n, 30)`` feature array (``top_30_features`` order) and its ``BatchScore``.
+
+        Scores are computed with the heuristic if the population keeps them
+        and none are given.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim != 2 or features.shape[1] != len(top_30_features):
+            raise ValueError(
+                f"expected a 2-D array with {len(top_30_features)} columns, got shape {features.shape}"
+            )
+        for j, feature in enumerate(top_30_features):
+            self._files[feature].write(features[:, j].astype(self.dtype).tobytes())
+        if "default_prob" in self._files:
+            if scores is None:
+                scores = score_batch(features)
+            for name in SCORE_COLUMNS:
+                column = np.ascontiguousarray(getattr(scores, name), dtype=self.columns[name]["dtype"])
+                self._files[name].write(column.tobytes())
+        self.rows += len(features)
+
+    def close(self):
+        """Finish the population, move it into place and open it."""
+        for f in self._files.values():
+            f.close()
+        header = {"format": FORMAT_VERSION, "rows": self.rows, "columns": self.columns}
+        with open(self._tmp / HEADER_FILE, "w") as f:
+            json.dump(header, f, indent=1)
+        # A directory can't be renamed over a non-empty one: move the old
+        # version aside first. Its files stay valid for processes mapping them
+        old = None
+        if self.path.exists():
+            old = Path(tempfile.mkdtemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".old"))
+            os.replace(self.path, old)
+        os.replace(self._tmp, self.path)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+        return Population(self.path)
+
+    def abort(self):
+        """Discard the population being written."""
+        for f in self._files.values():
+            f.close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_population(path, features, scores=None, dtype="float64", chunk_size=CHUNK_SIZE):
+    """Write an ``(n, 30)`` feature array, and its scores, as a population."""
+    writer = PopulationWriter(path, dtype, scores=True)
+    with writer:
+        for start in range(0, len(features), chunk_size):
+            stop = start + chunk_size
+            chunk_scores = None if scores is None else BatchScore(*(field[start:stop] for field in scores))
+            writer.append(features[start:stop], chunk_scores)
+    return Population(path)
+
+
+def convert_file(source, file_type, path, dtype="float64", scores=True, model=None,
+                 chunk_size=CHUNK_SIZE, on_progress=None):
+    """Convert a CSV or Parquet applications file into a population, scoring it with ``model``."""
+    from lending.bulk import iter_chunks, missing_columns, read_columns
+
+    missing = missing_columns(read_columns(source, file_type))
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    with PopulationWriter(path, dtype, scores=scores) as writer:
+        for chunk, progress in iter_chunks(source, file_type, top_30_features, chunk_size):
+            features = chunk[top_30_features].to_numpy(dtype=np.float64)
+            writer.append(features, score_batch(features, model) if scores else None)
+            if on_progress is not None:
+                on_progress(progress, writer.rows)
+    return Population(path)
+
+
+def main(argv=None):
+    from lending.bulk import file_type_for
+
+    parser = argparse.ArgumentParser(description="Convert and inspect columnar populations.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="convert a CSV or Parquet file into a population")
+    convert.add_argument("source")
+    convert.add_argument("out", help="population directory to write")
+    convert.add_argument("--dtype", choices=list(FEATURE_DTYPES), default="float64")
+    convert.add_argument("--no-scores", action="store_true", help="store the features only")
+    info = commands.add_parser("info", help="describe a population")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        if os.path.isdir(args.out) and not os.path.exists(os.path.join(args.out, HEADER_FILE)) \
+                and os.listdir(args.out):
+            print(f"{args.out} exists and is not a population; not overwriting it", file=sys.stderr)
+            return 1
+        with open(args.source, "rb") as source:
+            population = convert_file(source, file_type_for(args.source), args.out, args.dtype,
+                                      scores=not args.no_scores)
+        print(f"Wrote {len(population):,} applications to {args.out}")
+        return 0
+
+    population = Population(args.path)
+    size = sum(f.stat().st_size for f in population.path.glob("*.bin"))
+    print(f"{population.path}: {len(population):,} rows, {len(population.columns)} columns, "
+          f"{size / 2**20:,.1f} MiB")
+    for name, spec in population.header["columns"].items():
+        shape = "".join(f"[{d}]" for d in spec["shape"])
+        print(f"  {name:<40} {spec['kind']:<8} {spec['dtype']}{shape}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
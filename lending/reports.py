@@ -0,0 +1,389 @@
+"""Downloadable lending decision reports.
+
+A report holds what the Model Output page shows for one application: the
+decision, the default probability and confidence gauges, the key risk
+factors and the applicant profile. It can be rendered as
+
+- PDF: a small hand-written PDF with standard Helvetica text and the gauges
+  embedded as JPEG images, so no PDF library is needed,
+- HTML: a single self-contained page with the gauges inlined as PNG,
+- CSV: one row per application with every feature and score.
+
+Gauge images come from ``lending.figures.gauge_image``, which draws each
+distinct value once. Rendering runs on the ``report_generator`` thread pool,
+so a burst of downloads is capped at ``REPORT_WORKERS`` concurrent renders
+and never ties up the other Streamlit sessions. ``generate_many`` renders a
+whole batch in parallel into one ZIP (or one CSV); ``generate_decisions``
+does the same for decisions from the application store, reporting each as
+it was issued instead of re-scoring it with whatever model is active now.
+"""
+import csv
+import html
+import io
+import os
+import zipfile
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from lending.applicant import Applicant
+from lending.figures import GAUGE_IMAGE_SIZE, gauge_image
+from lending.metrics import timed
+from lending.schema import feature_categories, feature_descriptions, top_30_features
+from lending.scoring import RISK_FACTORS, cached_score_applicant
+
+# Concurrent report renders per process
+REPORT_WORKERS = int(os.environ.get("LENDING_REPORT_WORKERS", min(4, os.cpu_count() or 1)))
+
+FORMATS = {
+    "PDF": ("pdf", "application/pdf"),
+    "HTML": ("html", "text/html"),
+    "CSV": ("csv", "text/csv"),
+}
+
+CSV_COLUMNS = (
+    ["application_id", "generated_at"] + top_30_features
+    + ["model", "default_prob", "risk_level", "eligibility", "confidence"] + RISK_FACTORS
+)
+
+
+class Report(NamedTuple):
+    applicant: Applicant
+    prediction: dict
+    application_id: int = None
+    generated_at: datetime = None
+
+    @property
+    def title(self):
+        if self.application_id is None:
+            return "Lending Decision Report"
+        return f"Lending Decision Report – Application #{self.application_id}"
+
+    @property
+    def file_stem(self):
+        return "lending_report" if self.application_id is None else f"application_{self.application_id}"
+
+
+def build_report(applicant, application_id=None, model=None):
+    """Score ``applicant`` (an ``Applicant`` or feature dict) into a ``Report``."""
+    if not isinstance(applicant, Applicant):
+        applicant = Applicant.from_dict(applicant)
+    return Report(applicant.copy(), cached_score_applicant(applicant, model), application_id,
+                  datetime.now(timezone.utc))
+
+
+def decision_report(decision):
+    """The ``Report`` of a recorded ``Decision``, from its stored scores rather than re-scored."""
+    return Report(decision.applicant.copy(), decision.prediction(), decision.id, datetime.now(timezone.utc))
+
+
+def _format_value(value):
+    if isinstance(value, int) or value.is_integer():
+        return f"{value:,.0f}"
+    return f"{value:,.2f}" if abs(value) >= 100 else f"{value:,.4g}"
+
+
+def _profile(report):
+    # [(category, [(feature, formatted value), ...]), ...]
+    return [
+        (category, [(feature, _format_value(report.applicant[feature])) for feature in features])
+        for category, features in feature_categories.items()
+    ]
+
+
+# CSV
+
+def _csv_row(report):
+    prediction = report.prediction
+    row = [
+        "" if report.application_id is None else report.application_id,
+        report.generated_at.isoformat(timespec="seconds"),
+    ]
+    row += [report.applicant[feature] for feature in top_30_features]
+    row += [prediction["model"], prediction["default_prob"], prediction["risk_level"], prediction["eligible"], prediction["confidence"]]
+    row += [factor in prediction["risk_factors"] for factor in RISK_FACTORS]
+    return row
+
+
+def render_csv(reports):
+    """One CSV with a row per report."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    for report in reports:
+        writer.writerow(_csv_row(report))
+    return out.getvalue().encode()
+
+
+# HTML
+
+HTML_STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; color: #212121; max-width: 900px; margin: 2rem auto; }
+h1 { color: #1E88E5; }
+.meta { color: #757575; }
+.decision { display: flex; gap: 2rem; }
+.decision div { flex: 1; }
+.gauges { display: flex; gap: 2rem; }
+.gauges figure { flex: 1; margin: 0; text-align: center; }
+.gauges img { width: 100%; }
+table { border-collapse: collapse; width: 100%; }
+td, th { border-bottom: 1px solid #E0E0E0; padding: 4px 8px; text-align: left; }
+td.value { text-align: right; font-variant-numeric: tabular-nums; }
+"""
+
+
+def _img(name, value):
+    return f'<img alt="{name} gauge" src="data:image/png;base64,{b64encode(gauge_image(name, value)).decode()}">'
+
+
+def render_html(report):
+    p = report.prediction
+    factors = "".join(f"<li>{html.escape(f)}</li>" for f in p["risk_factors"]) or \
+        "<li>No significant risk factors identified.</li>"
+    profile = "".join(
+        f'<tr><th colspan="3">{html.escape(category)}</th></tr>' + "".join(
+            f'<tr><td>{feature}</td><td>{html.escape(feature_descriptions.get(feature, ""))}</td>'
+            f'<td class="value">{value}</td></tr>'
+            for feature, value in rows
+        )
+        for category, rows in _profile(report)
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(report.title)}</title><style>{HTML_STYLE}</style></head>
+<body>
+<h1>{html.escape(report.title)}</h1>
+<p class="meta">Generated {report.generated_at:%Y-%m-%d %H:%M:%S} UTC by model {html.escape(p["model"])}</p>
+<div class="decision">
+  <div><h3>Default Probability</h3><h2>{p["default_prob"]:.1%}</h2></div>
+  <div><h3>Risk Level</h3><h2 style="color: {p["risk_color"]}">{p["risk_level"]}</h2></div>
+  <div><h3>Loan Eligibility</h3><h2 style="color: {p["eligible_color"]}">{p["eligible"]}</h2>
+  <p>{html.escape(p["eligible_text"])}</p></div>
+</div>
+<div class="gauges">
+  <figure>{_img("default_prob", p["default_prob"] * 100)}<figcaption>Default probability</figcaption></figure>
+  <figure>{_img("confidence", p["confidence"])}<figcaption>Model confidence: {p["confidence"]}</figcaption></figure>
+</div>
+<h2>Key Risk Factors</h2>
+<ul>{factors}</ul>
+<h2>Applicant Profile</h2>
+<table>{profile}</table>
+</body></html>
+""".encode()
+
+
+# PDF
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4, in points
+MARGIN = 50
+
+
+def _pdf_text(text):
+    # Standard fonts use WinAnsiEncoding (cp1252); escape the string delimiters
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _pdf_color(hex_color):
+    hex_color = hex_color.lstrip("#")
+    return " ".join(f"{int(hex_color[i:i + 2], 16) / 255:.3f}" for i in (0, 2, 4))
+
+
+class _PDFWriter:
+    """Just enough PDF: text in Helvetica / Helvetica-Bold and JPEG images."""
+
+    def __init__(self):
+        self.pages = []  # content streams, as lists of bytes
+        self.images = []  # (name, jpeg bytes, (width, height) in pixels)
+        self.new_page()
+
+    def new_page(self):
+        self.page = []
+        self.pages.append(self.page)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def space(self, height):
+        # Start a new page if ``height`` points don't fit on this one
+        if self.y - height < MARGIN:
+            self.new_page()
+
+    def text(self, text, size=10, bold=False, color="#212121", x=MARGIN, advance=True):
+        self.space(size * 1.4)
+        font = b"/F2" if bold else b"/F1"
+        self.page.append(
+            b"BT %s %d Tf %s rg %.1f %.1f Td %s Tj ET\n"
+            % (font, size, _pdf_color(color).encode(), x, self.y - size, _pdf_text(text))
+        )
+        if advance:
+            self.y -= size * 1.4
+
+    def wrapped(self, text, size=10, width=PAGE_WIDTH - 2 * MARGIN, **kwargs):
+        # Helvetica averages about half an em per character
+        per_line = max(int(width / (size * 0.5)), 1)
+        line = ""
+        for word in text.split():
+            if line and len(line) + 1 + len(word) > per_line:
+                self.text(line, size, **kwargs)
+                line = word
+            else:
+                line = f"{line} {word}".strip()
+        if line:
+            self.text(line, size, **kwargs)
+
+    def image(self, jpeg, pixel_size, x, width):
+        height = width * pixel_size[1] / pixel_size[0]
+        name = f"Im{len(self.images) + 1}"
+        self.images.append((name, jpeg, pixel_size))
+        self.page.append(b"q %.1f 0 0 %.1f %.1f %.1f cm /%s Do Q\n"
+                         % (width, height, x, self.y - height, name.encode()))
+        return height
+
+    def tobytes(self):
+        objects = []
+
+        def add(data):
+            objects.append(data)
+            return len(objects)
+
+        catalog = add(None)
+        pages = add(None)
+        fonts = [add(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % name)
+                 for name in (b"Helvetica", b"Helvetica-Bold")]
+        images = {}
+        for name, jpeg, (width, height) in self.images:
+            images[name] = add(
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n%s\nendstream"
+                % (width, height, len(jpeg), jpeg)
+            )
+        xobjects = b" ".join(b"/%s %d 0 R" % (name.encode(), ref) for name, ref in images.items())
+        resources = b"<< /Font << /F1 %d 0 R /F2 %d 0 R >> /XObject << %s >> >>" % (*fonts, xobjects)
+        kids = []
+        for content in self.pages:
+            stream = b"".join(content)
+            ref = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+            kids.append(add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>"
+                            % (pages, PAGE_WIDTH, PAGE_HEIGHT, resources, ref)))
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+        objects[pages - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+        out = io.BytesIO()
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, data in enumerate(objects, start=1):
+            offsets.append(out.tell())
+            out.write(b"%d 0 obj\n%s\nendobj\n" % (number, data))
+        xref = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+        out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                  % (len(objects) + 1, catalog, xref))
+        return out.getvalue()
+
+
+def render_pdf(report):
+    p = report.prediction
+    pdf = _PDFWriter()
+    pdf.text(report.title, size=18, bold=True, color="#1E88E5")
+    pdf.text(f"Generated {report.generated_at:%Y-%m-%d %H:%M:%S} UTC by model {p['model']}", size=9, color="#757575")
+    pdf.y -= 10
+
+    pdf.text("Decision", size=14, bold=True)
+    pdf.text(f"Default probability: {p['default_prob']:.1%}", size=11)
+    pdf.text(f"Risk level: {p['risk_level']}", size=11, bold=True, color=p["risk_color"])
+    pdf.text(f"Loan eligibility: {p['eligible']}", size=11, bold=True, color=p["eligible_color"])
+    pdf.wrapped(p["eligible_text"], size=10)
+    pdf.y -= 10
+
+    gauge_width = (PAGE_WIDTH - 2 * MARGIN - 20) / 2
+    pdf.space(gauge_width * GAUGE_IMAGE_SIZE[1] / GAUGE_IMAGE_SIZE[0] + 30)
+    height = 0
+    for i, (name, value) in enumerate([("default_prob", p["default_prob"] * 100), ("confidence", p["confidence"])]):
+        height = pdf.image(gauge_image(name, value, format="JPEG"), GAUGE_IMAGE_SIZE,
+                           MARGIN + i * (gauge_width + 20), gauge_width)
+    pdf.y -= height + 4
+    pdf.text(f"Default probability: {p['default_prob']:.1%}", size=9, advance=False)
+    pdf.text(f"Model confidence: {p['confidence']}", size=9, x=MARGIN + gauge_width + 20)
+    pdf.y -= 10
+
+    pdf.text("Key Risk Factors", size=14, bold=True)
+    for factor in p["risk_factors"] or ["No significant risk factors identified."]:
+        pdf.text(f"• {factor}", size=10)
+    pdf.y -= 10
+
+    pdf.text("Applicant Profile", size=14, bold=True)
+    for category, rows in _profile(report):
+        pdf.y -= 4
+        pdf.text(category, size=11, bold=True)
+        for feature, value in rows:
+            pdf.text(feature, size=9, advance=False)
+            pdf.text(value, size=9, x=PAGE_WIDTH - MARGIN - 100)
+    return pdf.tobytes()
+
+
+_RENDERERS = {"PDF": render_pdf, "HTML": render_html}
+
+
+def render(report, format):
+    """Render one report as ``"PDF"``, ``"HTML"`` or ``"CSV"`` bytes."""
+    with timed(f"report.{format.lower()}"):
+        if format == "CSV":
+            return render_csv([report])
+        return _RENDERERS[format](report)
+
+
+class ReportGenerator:
+    """Renders reports on a bounded thread pool."""
+
+    def __init__(self, max_workers=REPORT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+
+    def _submit(self, build, format):
+        # build: a callable returning the Report to render
+        return self._executor.submit(lambda: render(build(), format))
+
+    def submit(self, applicant, format, application_id=None, model=None):
+        """Start rendering a report; returns a future of its bytes."""
+        return self._submit(lambda: build_report(applicant, application_id, model), format)
+
+    def generate(self, applicant, format, application_id=None, model=None):
+        return self.submit(applicant, format, application_id, model).result()
+
+    def generate_decision(self, decision, format):
+        """Render the report of a recorded ``Decision`` as it was issued."""
+        return self._submit(lambda: decision_report(decision), format).result()
+
+    def generate_many(self, items, format, model=None):
+        """Render reports for ``(applicant, application_id)`` pairs.
+
+        Returns one CSV for ``"CSV"``, or a ZIP with one file per application
+        otherwise. Reports render in parallel on the pool.
+        """
+        return self._bundle(
+            [(application_id, lambda item=(applicant, application_id): build_report(*item, model))
+             for applicant, application_id in items],
+            format,
+        )
+
+    def generate_decisions(self, decisions, format):
+        """``generate_many`` for recorded ``Decision``s, reported as they were issued."""
+        return self._bundle(
+            [(decision.id, lambda decision=decision: decision_report(decision)) for decision in decisions], format
+        )
+
+    def _bundle(self, builds, format):
+        # builds: (application_id, build) pairs
+        if format == "CSV":
+            return render_csv(self._executor.map(lambda item: item[1](), builds))
+        extension = FORMATS[format][0]
+        futures = [(application_id, self._submit(build, format)) for application_id, build in builds]
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+            for i, (application_id, future) in enumerate(futures):
+                stem = f"application_{application_id}" if application_id is not None else f"report_{i + 1}"
+                archive.writestr(f"{stem}.{extension}", future.result())
+        return out.getvalue()
+
+
+report_generator = ReportGenerator()
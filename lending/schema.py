@@ -0,0 +1,165 @@
+"""Feature schema shared by the dashboard and the scoring code."""
+
+# Updated top 30 features list
+top_30_features = [
+    "CREDIT_CARD_AVAILABLE_TOTAL",
+    "RECENT_OPEN_ACCT_CUR_BAL_OPEN_TOTAL",
+    "PAYMENT_MADE_CNT_TOTAL",
+    "PAYMENT_MADE_CNT_TAGGED_TOTAL",
+    "ALL_CREDIT_HISTORY_MONTHS_TOTAL",
+    "AUTO_PAYMENT_MADE_CNT_TOTAL",
+    "INQUIRY_CNT_TOTAL",
+    "DELINQ_CNT_30_DAY_TOTAL",
+    "INQUIRY_RECENT_CNT_TOTAL",
+    "REVOLVING_UTILIZATION_TAGGED_TOTAL",
+    "CREDIT_SCORE_AVG_CALC",
+    "DEALER_ADDS_PERCENT",
+    "TOTAL_DOWN_CONTRACT_PERCENT",
+    "PAYMENT_AMOUNT",
+    "AUTO_PTI_TOTAL",
+    "LTV_FRONT",
+    "FE_LTV_BACK",
+    "VEHICLE_MILEAGE",
+    "CREDIT_CARD_CUR_BAL_TOTAL",
+    "AUTO_CREDIT_HISTORY_MONTHS_MAX_TOTAL",
+    "REBATE_PERCENT",
+    "CASH_DOWN_CONTRACT_PERCENT",
+    "FE_DEBT_TO_INCOME",
+    "BANK_CARD_CREDIT_LIMIT_TOTAL",
+    "RECENT_OPEN_ACCT_TRDLN_OPEN_TOTAL",
+    "DEALER_RESERVE",
+    "DEROG_CUR_BAL_TOTAL",
+    "CREDIT_CARD_CREDIT_LIMIT_TOTAL",
+    "FE_TOTAL_INCOME",
+    "FE_RESIDENCE_TOTAL_MONTHS"
+]
+
+# Feature categories for organization
+feature_categories = {
+    "Credit & Balance": [
+        "CREDIT_CARD_AVAILABLE_TOTAL",
+        "RECENT_OPEN_ACCT_CUR_BAL_OPEN_TOTAL",
+        "CREDIT_CARD_CUR_BAL_TOTAL",
+        "BANK_CARD_CREDIT_LIMIT_TOTAL",
+        "DEROG_CUR_BAL_TOTAL",
+        "CREDIT_CARD_CREDIT_LIMIT_TOTAL",
+        "REVOLVING_UTILIZATION_TAGGED_TOTAL"
+    ],
+    "Payment History": [
+        "PAYMENT_MADE_CNT_TOTAL",
+        "PAYMENT_MADE_CNT_TAGGED_TOTAL",
+        "AUTO_PAYMENT_MADE_CNT_TOTAL",
+        "PAYMENT_AMOUNT",
+        "ALL_CREDIT_HISTORY_MONTHS_TOTAL",
+        "AUTO_CREDIT_HISTORY_MONTHS_MAX_TOTAL"
+    ],
+    "Delinquency & Inquiries": [
+        "INQUIRY_CNT_TOTAL",
+        "DELINQ_CNT_30_DAY_TOTAL",
+        "INQUIRY_RECENT_CNT_TOTAL",
+        "RECENT_OPEN_ACCT_TRDLN_OPEN_TOTAL"
+    ],
+    "Loan Structure": [
+        "DEALER_ADDS_PERCENT",
+        "TOTAL_DOWN_CONTRACT_PERCENT",
+        "LTV_FRONT",
+        "FE_LTV_BACK",
+        "REBATE_PERCENT",
+        "CASH_DOWN_CONTRACT_PERCENT",
+        "DEALER_RESERVE"
+    ],
+    "Risk & Eligibility": [
+        "CREDIT_SCORE_AVG_CALC",
+        "AUTO_PTI_TOTAL",
+        "FE_DEBT_TO_INCOME",
+        "FE_TOTAL_INCOME",
+        "FE_RESIDENCE_TOTAL_MONTHS",
+        "VEHICLE_MILEAGE"
+    ]
+}
+
+# Feature descriptions - short explanations for each feature
+feature_descriptions = {
+    "CREDIT_CARD_AVAILABLE_TOTAL": "Total available credit across all credit cards",
+    "RECENT_OPEN_ACCT_CUR_BAL_OPEN_TOTAL": "Total balance of recently opened accounts",
+    "PAYMENT_MADE_CNT_TOTAL": "Total number of payments made across all accounts",
+    "PAYMENT_MADE_CNT_TAGGED_TOTAL": "Total number of tagged payments made",
+    "ALL_CREDIT_HISTORY_MONTHS_TOTAL": "Total months of credit history across all accounts",
+    "AUTO_PAYMENT_MADE_CNT_TOTAL": "Total number of auto payments made",
+    "INQUIRY_CNT_TOTAL": "Total number of credit inquiries",
+    "DELINQ_CNT_30_DAY_TOTAL": "Total number of 30-day delinquencies",
+    "INQUIRY_RECENT_CNT_TOTAL": "Total number of recent credit inquiries",
+    "REVOLVING_UTILIZATION_TAGGED_TOTAL": "Total utilization of tagged revolving accounts",
+    "CREDIT_SCORE_AVG_CALC": "Calculated average credit score",
+    "DEALER_ADDS_PERCENT": "Percentage of dealer additions to loan amount",
+    "TOTAL_DOWN_CONTRACT_PERCENT": "Total down payment percentage in contract",
+    "PAYMENT_AMOUNT": "Monthly payment amount",
+    "AUTO_PTI_TOTAL": "Auto payment-to-income ratio",
+    "LTV_FRONT": "Loan-to-value ratio (front-end)",
+    "FE_LTV_BACK": "Loan-to-value ratio (back-end)",
+    "VEHICLE_MILEAGE": "Mileage of the vehicle being financed",
+    "CREDIT_CARD_CUR_BAL_TOTAL": "Total current balance on all credit cards",
+    "AUTO_CREDIT_HISTORY_MONTHS_MAX_TOTAL": "Maximum months of auto credit history",
+    "REBATE_PERCENT": "Percentage of rebates applied to purchase",
+    "CASH_DOWN_CONTRACT_PERCENT": "Cash down payment percentage in contract",
+    "FE_DEBT_TO_INCOME": "Front-end debt-to-income ratio",
+    "BANK_CARD_CREDIT_LIMIT_TOTAL": "Total credit limit across bank cards",
+    "RECENT_OPEN_ACCT_TRDLN_OPEN_TOTAL": "Total tradelines for recently opened accounts",
+    "DEALER_RESERVE": "Amount reserved by dealer in financing",
+    "DEROG_CUR_BAL_TOTAL": "Total current balance on derogatory accounts",
+    "CREDIT_CARD_CREDIT_LIMIT_TOTAL": "Total credit limit across all credit cards",
+    "FE_TOTAL_INCOME": "Total front-end income",
+    "FE_RESIDENCE_TOTAL_MONTHS": "Total months at current residence"
+}
+
+# Define default values and input types for each feature
+feature_input_config = {
+    "CREDIT_CARD_AVAILABLE_TOTAL": {"type": "number", "min": 0, "max": 100000, "default": 10000, "step": 1000},
+    "RECENT_OPEN_ACCT_CUR_BAL_OPEN_TOTAL": {"type": "number", "min": 0, "max": 100000, "default": 5000, "step": 1000},
+    "PAYMENT_MADE_CNT_TOTAL": {"type": "slider", "min": 0, "max": 100, "default": 24},
+    "PAYMENT_MADE_CNT_TAGGED_TOTAL": {"type": "slider", "min": 0, "max": 100, "default": 20},
+    "ALL_CREDIT_HISTORY_MONTHS_TOTAL": {"type": "slider", "min": 0, "max": 360, "default": 60},
+    "AUTO_PAYMENT_MADE_CNT_TOTAL": {"type": "slider", "min": 0, "max": 100, "default": 18},
+    "INQUIRY_CNT_TOTAL": {"type": "slider", "min": 0, "max": 30, "default": 3},
+    "DELINQ_CNT_30_DAY_TOTAL": {"type": "slider", "min": 0, "max": 20, "default": 0},
+    "INQUIRY_RECENT_CNT_TOTAL": {"type": "slider", "min": 0, "max": 10, "default": 1},
+    "REVOLVING_UTILIZATION_TAGGED_TOTAL": {"type": "slider", "min": 0.0, "max": 1.0, "default": 0.3, "step": 0.01},
+    "CREDIT_SCORE_AVG_CALC": {"type": "slider", "min": 300, "max": 850, "default": 680},
+    "DEALER_ADDS_PERCENT": {"type": "slider", "min": 0.0, "max": 0.3, "default": 0.05, "step": 0.01},
+    "TOTAL_DOWN_CONTRACT_PERCENT": {"type": "slider", "min": 0.0, "max": 0.5, "default": 0.15, "step": 0.01},
+    "PAYMENT_AMOUNT": {"type": "number", "min": 100, "max": 2000, "default": 450, "step": 50},
+    "AUTO_PTI_TOTAL": {"type": "slider", "min": 0.0, "max": 0.5, "default": 0.18, "step": 0.01},
+    "LTV_FRONT": {"type": "slider", "min": 0.5, "max": 1.5, "default": 0.9, "step": 0.01},
+    "FE_LTV_BACK": {"type": "slider", "min": 0.5, "max": 1.5, "default": 0.85, "step": 0.01},
+    "VEHICLE_MILEAGE": {"type": "number", "min": 0, "max": 150000, "default": 35000, "step": 1000},
+    "CREDIT_CARD_CUR_BAL_TOTAL": {"type": "number", "min": 0, "max": 100000, "default": 7500, "step": 500},
+    "AUTO_CREDIT_HISTORY_MONTHS_MAX_TOTAL": {"type": "slider", "min": 0, "max": 240, "default": 48},
+    "REBATE_PERCENT": {"type": "slider", "min": 0.0, "max": 0.2, "default": 0.03, "step": 0.01},
+    "CASH_DOWN_CONTRACT_PERCENT": {"type": "slider", "min": 0.0, "max": 0.5, "default": 0.1, "step": 0.01},
+    "FE_DEBT_TO_INCOME": {"type": "slider", "min": 0.0, "max": 0.6, "default": 0.32, "step": 0.01},
+    "BANK_CARD_CREDIT_LIMIT_TOTAL": {"type": "number", "min": 0, "max": 100000, "default": 15000, "step": 1000},
+    "RECENT_OPEN_ACCT_TRDLN_OPEN_TOTAL": {"type": "slider", "min": 0, "max": 10, "default": 2},
+    "DEALER_RESERVE": {"type": "number", "min": 0, "max": 5000, "default": 500, "step": 100},
+    "DEROG_CUR_BAL_TOTAL": {"type": "number", "min": 0, "max": 10000, "default": 0, "step": 500},
+    "CREDIT_CARD_CREDIT_LIMIT_TOTAL": {"type": "number", "min": 0, "max": 100000, "default": 18000, "step": 1000},
+    "FE_TOTAL_INCOME": {"type": "number", "min": 20000, "max": 300000, "default": 75000, "step": 5000},
+    "FE_RESIDENCE_TOTAL_MONTHS": {"type": "slider", "min": 0, "max": 240, "default": 48}
+}
+
+# Features that count things (payments, inquiries, accounts, months) and so
+# only take whole numbers; currency amounts, ratios and scores are floats
+count_features = [
+    "PAYMENT_MADE_CNT_TOTAL",
+    "PAYMENT_MADE_CNT_TAGGED_TOTAL",
+    "AUTO_PAYMENT_MADE_CNT_TOTAL",
+    "DELINQ_CNT_30_DAY_TOTAL",
+    "INQUIRY_CNT_TOTAL",
+    "INQUIRY_RECENT_CNT_TOTAL",
+    "RECENT_OPEN_ACCT_TRDLN_OPEN_TOTAL",
+    "ALL_CREDIT_HISTORY_MONTHS_TOTAL",
+    "AUTO_CREDIT_HISTORY_MONTHS_MAX_TOTAL",
+    "FE_RESIDENCE_TOTAL_MONTHS",
+]
+
+# Position of each feature in a row laid out by top_30_features
+feature_index = {feature: i for i, feature in enumerate(top_30_features)}
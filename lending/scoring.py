@@ -0,0 +1,370 @@
+"""Vectorized scoring for the lending model.
+
+The rules here are the demonstration heuristic used on the Model Output page,
+declared as a rule table (see ``lending.rules``) and compiled once into
+threshold arrays, so a whole population can be scored in one pass.
+``score_applicant`` runs a single feature dict through the same code path, so
+the dashboard and batch jobs always agree.
+
+Every scoring function also takes an optional ``model`` from
+``lending.models``. It replaces the heuristic default probability; the risk
+level and eligibility bands and the key risk factors still come from the
+rule table. ``None`` means the heuristic.
+"""
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from lending.applicant import Applicant
+from lending.cache import LRUCache
+from lending.metrics import registry
+from lending.rules import Band, Capped, Flag, Ladder, compile_ladder, compile_rules
+from lending.schema import feature_index, feature_input_config, top_30_features
+
+BASE_DEFAULT_PROB = 0.05
+MIN_DEFAULT_PROB = 0.01
+MAX_DEFAULT_PROB = 0.99
+
+# Applicants kept in the process-wide score cache
+SCORE_CACHE_SIZE = int(os.environ.get("LENDING_SCORE_CACHE_SIZE", 4096))
+
+# Default probability adjustments, applied to BASE_DEFAULT_PROB in this order
+DEFAULT_PROB_RULES = [
+    # Credit score impact (lower score = higher default risk): bands are [lo, hi)
+    Band("CREDIT_SCORE_AVG_CALC", (600, 650, 700), (0.25, 0.15, 0.05, -0.02), closed="left"),
+    # Delinquency impact, capped
+    Capped("DELINQ_CNT_30_DAY_TOTAL", step=0.03, cap=0.3),
+    # The remaining adjustments use (lo, hi] bands, i.e. "value > cut" ladders
+    Band("FE_DEBT_TO_INCOME", (0.28, 0.36, 0.45), (0.0, 0.05, 0.1, 0.2)),
+    Band("LTV_FRONT", (0.8, 0.95, 1.1), (0.0, 0.03, 0.08, 0.15)),
+    Band("FE_TOTAL_INCOME", (50000, 80000, 120000), (0.02, -0.01, -0.03, -0.05)),
+    Band("REVOLVING_UTILIZATION_TAGGED_TOTAL", (0.4, 0.6, 0.8), (0.0, 0.04, 0.08, 0.12)),
+    Band("PAYMENT_MADE_CNT_TOTAL", (12, 24, 48), (0.0, -0.02, -0.04, -0.08)),
+]
+
+# Display names of the score components, one per adjusted feature
+SCORE_COMPONENTS = {
+    "CREDIT_SCORE_AVG_CALC": "Credit score",
+    "DELINQ_CNT_30_DAY_TOTAL": "Delinquency",
+    "FE_DEBT_TO_INCOME": "Debt-to-income",
+    "LTV_FRONT": "Loan-to-value",
+    "FE_TOTAL_INCOME": "Income",
+    "REVOLVING_UTILIZATION_TAGGED_TOTAL": "Utilization",
+    "PAYMENT_MADE_CNT_TOTAL": "Payments",
+}
+
+# Key risk factors shown on the Model Output page, in display order
+RISK_FACTOR_RULES = [
+    Flag("Low credit score", "CREDIT_SCORE_AVG_CALC", "<", 650),
+    Flag("Presence of delinquencies", "DELINQ_CNT_30_DAY_TOTAL", ">", 0),
+    Flag("High debt-to-income ratio", "FE_DEBT_TO_INCOME", ">", 0.40),
+    Flag("High loan-to-value ratio", "LTV_FRONT", ">", 1.0),
+    Flag("High credit utilization", "REVOLVING_UTILIZATION_TAGGED_TOTAL", ">", 0.6),
+    Flag("Limited payment history", "PAYMENT_MADE_CNT_TOTAL", "<", 12),
+]
+
+# Risk level bands over default probability, [lo, hi): (label, color)
+RISK_LEVEL_LADDER = Ladder((0.1, 0.2, 0.35, 0.5), (
+    ("Low Risk", "#4CAF50"),  # Green
+    ("Moderate Risk", "#FFC107"),  # Amber
+    ("Medium Risk", "#FF9800"),  # Orange
+    ("High Risk", "#F44336"),  # Red
+    ("Very High Risk", "#B71C1C"),  # Deep Red
+))
+
+# Default probability gauge step colors, one per risk level band; the gauge
+# keeps its own lighter ramp rather than the risk level colors
+RISK_LEVEL_GAUGE_COLORS = ("#4CAF50", "#8BC34A", "#FFC107", "#FF9800", "#F44336")
+
+# Loan eligibility bands over default probability, [lo, hi): (label, color, text)
+ELIGIBILITY_LADDER = Ladder((0.25, 0.4), (
+    ("Approved", "#4CAF50",
+     "This application meets our lending criteria and is approved."),
+    ("Conditionally Approved", "#FFC107",
+     "This application is approved subject to additional conditions (higher interest rate or lower loan amount)."),
+    ("Declined", "#F44336",
+     "This application does not meet our lending criteria."),
+))
+
+# Compiled once at import; scoring only runs the compiled kernels
+RULES = compile_rules(DEFAULT_PROB_RULES, RISK_FACTOR_RULES,
+                      BASE_DEFAULT_PROB, MIN_DEFAULT_PROB, MAX_DEFAULT_PROB)
+RISK_LEVEL_BANDS = compile_ladder(RISK_LEVEL_LADDER)
+ELIGIBILITY_BANDS = compile_ladder(ELIGIBILITY_LADDER)
+
+RISK_LEVEL_CUTS = RISK_LEVEL_BANDS.cuts
+RISK_LEVELS = RISK_LEVEL_BANDS.bands
+ELIGIBILITY_CUTS = ELIGIBILITY_BANDS.cuts
+ELIGIBILITY = ELIGIBILITY_BANDS.bands
+RISK_FACTORS = RULES.labels
+
+# Features the rules actually read
+SCORED_FEATURES = RULES.features
+
+_SCORED_INDEX = np.array([feature_index[feature] for feature in SCORED_FEATURES])
+
+# Version name of the rule-table heuristic, used when no model is given
+HEURISTIC_VERSION = "heuristic"
+
+
+class BatchScore(NamedTuple):
+    default_prob: np.ndarray  # float64, shape (n,)
+    risk_level: np.ndarray  # int8 index into RISK_LEVELS
+    eligibility: np.ndarray  # int8 index into ELIGIBILITY
+    risk_factors: np.ndarray  # bool, shape (n, len(RISK_FACTORS))
+    confidence: np.ndarray  # int64 model confidence, 70-100
+
+    def __len__(self):
+        return len(self.default_prob)
+
+    def to_frame(self):
+        """Return the scores as a DataFrame with human-readable labels."""
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            "default_prob": self.default_prob,
+            "risk_level": pd.Categorical.from_codes(self.risk_level, [r[0] for r in RISK_LEVELS]),
+            "eligibility": pd.Categorical.from_codes(self.eligibility, [e[0] for e in ELIGIBILITY]),
+            "confidence": self.confidence,
+        })
+        for i, factor in enumerate(RISK_FACTORS):
+            frame[factor] = self.risk_factors[:, i]
+        return frame
+
+    def to_dicts(self, model_version=HEURISTIC_VERSION):
+        """Return one JSON-ready result dict per row, as the scoring service answers."""
+        risk_levels = [RISK_LEVELS[i][0] for i in self.risk_level.tolist()]
+        eligibility = [ELIGIBILITY[i][0] for i in self.eligibility.tolist()]
+        return [
+            {
+                "default_prob": prob,
+                "risk_level": risk_level,
+                "eligibility": eligible,
+                "risk_factors": [f for f, hit in zip(RISK_FACTORS, hits) if hit],
+                "confidence": confidence,
+                "model": model_version,
+            }
+            for prob, risk_level, eligible, hits, confidence in zip(
+                self.default_prob.tolist(), risk_levels, eligibility,
+                self.risk_factors.tolist(), self.confidence.tolist(),
+            )
+        ]
+
+
+def feature_column(frame, feature):
+    """One feature of ``frame`` as a float64 array, with defaults filled in.
+
+    ``frame`` is anything ``score_batch`` accepts. Missing columns and NaNs
+    fall back to the configured default, like the per-applicant
+    ``feature_values.get(feature, default)`` lookups did.
+    """
+    default = feature_input_config[feature]["default"]
+    if isinstance(frame, np.ndarray):
+        values = frame[:, feature_index[feature]]
+    elif feature in frame:
+        values = frame[feature]
+        if hasattr(values, "to_numpy"):
+            values = values.to_numpy()
+    else:
+        return np.full(len(frame), default, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    if missing.any():
+        values = np.where(missing, default, values)
+    return values
+
+
+def feature_matrix(frame):
+    """The ``(n, 30)`` float64 feature matrix of ``frame``, with defaults filled in."""
+    return np.column_stack([feature_column(frame, feature) for feature in top_30_features])
+
+
+def score_batch(frame, model=None):
+    """Score a DataFrame, ``Population`` or 2-D array whose columns follow ``top_30_features``.
+
+    Returns a ``BatchScore`` with one entry per row. Results are identical to
+    running each row through the Model Output page.
+    """
+    if not isinstance(frame, np.ndarray) and not hasattr(frame, "columns"):
+        frame = np.asarray(frame, dtype=np.float64)
+    if isinstance(frame, np.ndarray):
+        if frame.ndim != 2 or frame.shape[1] != len(top_30_features):
+            raise ValueError(
+                f"expected a 2-D array with {len(top_30_features)} columns, got shape {frame.shape}"
+            )
+
+    columns = {feature: feature_column(frame, feature) for feature in SCORED_FEATURES}
+    n = len(frame)
+
+    # 1. Default probability; adjustments are applied in table order, the
+    # same order as the original per-applicant rules, so floating point
+    # results match exactly
+    if model is None:
+        default_prob = RULES.default_prob(columns, n)
+    else:
+        default_prob = np.asarray(model.predict(feature_matrix(frame)), dtype=np.float64).reshape(n)
+        default_prob = np.clip(default_prob, MIN_DEFAULT_PROB, MAX_DEFAULT_PROB)
+
+    return _batch_score(default_prob, RULES.risk_factors(columns, n))
+
+
+def _batch_score(default_prob, risk_factors):
+    # 2. Risk level and 3. loan eligibility, and the confidence from the
+    # number of key risk factors raised
+    risk_level = RISK_LEVEL_BANDS.index(default_prob)
+    eligibility = ELIGIBILITY_BANDS.index(default_prob)
+    return BatchScore(default_prob, risk_level, eligibility, risk_factors, confidence(risk_factors.sum(axis=1)))
+
+
+def confidence(n_risk_factors):
+    """Model confidence, 70-100, given the number of key risk factors raised."""
+    return np.maximum(70, 100 - np.asarray(n_risk_factors) * 5)
+
+
+def score_applicant(feature_values, model=None):
+    """Score a single applicant given an ``Applicant`` or ``{feature: value}`` dict.
+
+    Returns a dict with the default probability, risk level, eligibility,
+    the list of triggered risk factors and the model version, ready for
+    display.
+    """
+    if isinstance(feature_values, Applicant):
+        row = feature_values.values[np.newaxis, :]
+    else:
+        row = np.array(
+            [[feature_values.get(feature, np.nan) for feature in top_30_features]],
+            dtype=np.float64,
+        )
+    return _prediction(score_batch(row, model), model)
+
+
+def _prediction(scores, model):
+    # The display dict for the first row of ``scores``
+    risk_level, risk_color = RISK_LEVELS[scores.risk_level[0]]
+    eligible, eligible_color, eligible_text = ELIGIBILITY[scores.eligibility[0]]
+    return {
+        "default_prob": float(scores.default_prob[0]),
+        "risk_level": risk_level,
+        "risk_color": risk_color,
+        "eligible": eligible,
+        "eligible_color": eligible_color,
+        "eligible_text": eligible_text,
+        "risk_factors": [f for f, hit in zip(RISK_FACTORS, scores.risk_factors[0]) if hit],
+        "confidence": int(scores.confidence[0]),
+        "model": HEURISTIC_VERSION if model is None else model.version,
+    }
+
+
+class IncrementalScore:
+    """The heuristic score of one applicant, kept up to date edit by edit.
+
+    Every rule's contribution is kept, and ``update`` re-runs only the rules
+    that read a changed feature (see ``RULES.dependencies``) before adding
+    the contributions up again in table order, so the result is identical to
+    ``score_applicant``.
+    """
+
+    def __init__(self, feature_values):
+        self.applicant = _as_applicant(feature_values)
+        self.adjustments = [RULES.adjustment(i, self._value(rule.feature))
+                            for i, rule in enumerate(RULES.adjustments)]
+        self.flags = np.array([[RULES.flag(j, self._value(flag.feature))[0] for j, flag in enumerate(RULES.flags)]])
+        self.changed = []
+        self.prediction = self._predict()
+
+    def _value(self, feature):
+        # A 1-element array, with a missing value replaced by its default
+        return feature_column(self.applicant.values[np.newaxis, :], feature)
+
+    def _predict(self):
+        default_prob = RULES.combine(self.adjustments, 1)
+        return _prediction(_batch_score(default_prob, self.flags), None)
+
+    def update(self, feature_values):
+        """Rescore after an edit; returns the scored features that changed."""
+        applicant = _as_applicant(feature_values)
+        changed = _changed(self.applicant, applicant)
+        self.applicant = applicant
+        for feature in changed:
+            adjustments, flags = RULES.dependencies[feature]
+            value = self._value(feature)
+            for i in adjustments:
+                self.adjustments[i] = RULES.adjustment(i, value)
+            for j in flags:
+                self.flags[0, j] = RULES.flag(j, value)[0]
+        if changed:
+            self.prediction = self._predict()
+        self.changed = changed
+        return changed
+
+    def breakdown(self):
+        """``(feature, contribution)`` of each default probability adjustment, in table order."""
+        return [(rule.feature, float(delta[0])) for rule, delta in zip(RULES.adjustments, self.adjustments)]
+
+    def copy(self):
+        """An independent copy; updating it leaves this score unchanged."""
+        other = object.__new__(IncrementalScore)
+        other.applicant = self.applicant
+        other.adjustments = list(self.adjustments)
+        other.flags = self.flags.copy()
+        other.changed = list(self.changed)
+        other.prediction = dict(self.prediction, risk_factors=list(self.prediction["risk_factors"]))
+        return other
+
+
+def _changed(before, after):
+    # The scored features whose values differ between two applicants
+    old, new = before.values[_SCORED_INDEX], after.values[_SCORED_INDEX]
+    return [SCORED_FEATURES[k] for k in np.flatnonzero((old != new) & ~(np.isnan(old) & np.isnan(new)))]
+
+
+def _as_applicant(feature_values):
+    if isinstance(feature_values, Applicant):
+        return feature_values.copy()
+    return Applicant.from_dict(feature_values)
+
+
+score_cache = LRUCache(SCORE_CACHE_SIZE)
+registry.gauge("lending_score_cache_hits", "Score cache hits", lambda: score_cache.hits)
+registry.gauge("lending_score_cache_misses", "Score cache misses", lambda: score_cache.misses)
+registry.gauge("lending_score_cache_size", "Applicants in the score cache", lambda: len(score_cache))
+
+
+def cached_score_applicant(feature_values, model=None):
+    """``score_applicant`` memoized on the model and the applicant's feature values.
+
+    The cache is shared by every session in the process and evicts the least
+    recently used applicants; see ``score_cache.stats()`` for hit/miss counts.
+    """
+    applicant = _as_applicant(feature_values)
+    # A model's cache_key changes when its artifact is replaced, so a
+    # re-deployed version never serves stale scores
+    key = (None if model is None else model.cache_key, applicant.cache_key())
+    prediction = score_cache.get_or_compute(key, lambda: score_applicant(applicant, model))
+    # Callers get their own copy so the cached entry can't be modified
+    return dict(prediction, risk_factors=list(prediction["risk_factors"]))
+
+
+def cached_score_state(feature_values, previous=None):
+    """The heuristic ``IncrementalScore`` of ``feature_values``, from the shared score cache.
+
+    ``previous`` is the caller's score of an earlier version of the
+    application. On a miss it is updated with the edit, so only the rules
+    that read the edited features are re-run; without it the applicant is
+    scored in full. ``changed`` lists the features edited since
+    ``previous``. The caller gets its own copy.
+    """
+    applicant = _as_applicant(feature_values)
+    key = ("state", applicant.cache_key())
+    state = score_cache.get(key)
+    if state is None:
+        if previous is None:
+            state = IncrementalScore(applicant)
+        else:
+            state = previous.copy()
+            state.update(applicant)
+        score_cache.put(key, state)
+    state = state.copy()
+    state.changed = [] if previous is None else _changed(previous.applicant, applicant)
+    return state
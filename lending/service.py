@@ -0,0 +1,168 @@
+"""Headless HTTP scoring service.
+
+A plain ASGI application exposing the same scoring rules as the dashboard,
+for machine-to-machine calls:
+
+    POST /score         one applicant: {"FEATURE_NAME": value, ...}
+    POST /score/batch   a JSON array of applicants, answered with an array of results
+    GET  /health
+    GET  /metrics       Prometheus text format
+
+Requests are scored with the active model of ``lending.models``, whose
+version is returned with every result. Features that are left out fall back
+to their configured defaults, just like the dashboard. Unknown features,
+values outside the ``feature_input_config`` ranges and inconsistent values
+(see ``lending.validation``) are rejected with a 422 response listing every
+problem.
+
+Bodies larger than ``INLINE_BODY_SIZE`` are parsed and scored on the event
+loop's thread pool, so one large batch doesn't hold up other requests.
+
+Run it with ``uvicorn lending.service:app`` (or ``python -m lending.service``).
+"""
+import asyncio
+import json
+
+from lending.metrics import render_prometheus, timed
+from lending.models import model_registry
+from lending.scoring import score_batch
+from lending.shadow import shadow_scorer
+from lending.validation import VALIDATOR, parse_records
+
+# Largest accepted request body, in bytes
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Larger bodies are handled off the event loop; smaller ones aren't worth the hand-off
+INLINE_BODY_SIZE = 64 * 1024
+
+
+class RequestError(Exception):
+    def __init__(self, status, message, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.errors = errors or []
+
+
+def _checked(applicants, indexed=True):
+    # Parses and validates a list of applicants; raises a 422 listing every problem
+    rows, errors = parse_records(applicants, indexed)
+    errors += VALIDATOR.validate(rows).errors(indexed=indexed)
+    if errors:
+        if indexed:
+            errors.sort(key=lambda error: error["index"])
+        raise RequestError(422, "invalid applicants" if indexed else "invalid applicant", errors)
+    return rows
+
+
+def _score(rows):
+    # Scores with the active model, and queues the rows for the challenger
+    model = model_registry.active()
+    scores = score_batch(rows, model)
+    shadow_scorer.submit(rows, model, scores)
+    return scores.to_dicts(model.version)
+
+
+@timed("api.score")
+def score(applicant):
+    """Validate and score one applicant dict."""
+    return _score(_checked([applicant], indexed=False))[0]
+
+
+@timed("api.score_batch")
+def score_many(applicants):
+    """Validate and score a list of applicant dicts."""
+    if not isinstance(applicants, list):
+        raise RequestError(422, "request body must be a JSON array of applicants")
+    return _score(_checked(applicants))
+
+
+async def _read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_SIZE:
+            raise RequestError(413, "request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _send(send, status, body, content_type, headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status, payload, headers=()):
+    await _send(send, status, json.dumps(payload).encode(), b"application/json", headers)
+
+
+def _handle(handler, body):
+    # Parses, scores and encodes one request
+    try:
+        payload = json.loads(body)
+    except (ValueError, RecursionError):
+        # RecursionError: nested too deeply for the decoder
+        raise RequestError(400, "request body is not valid JSON")
+    return json.dumps(handler(payload)).encode()
+
+
+ROUTES = {
+    ("POST", "/score"): score,
+    ("POST", "/score/batch"): score_many,
+}
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"].rstrip("/") or "/"
+    if (method, path) == ("GET", "/health"):
+        await _send_json(send, 200, {"status": "ok"})
+        return
+    if (method, path) == ("GET", "/metrics"):
+        await _send(send, 200, render_prometheus().encode(), b"text/plain; version=0.0.4")
+        return
+
+    handler = ROUTES.get((method, path))
+    if handler is None:
+        allowed = sorted(m for m, p in ROUTES if p == path)
+        if allowed:
+            await _send_json(send, 405, {"error": "method not allowed"},
+                             [(b"allow", ", ".join(allowed).encode())])
+        else:
+            await _send_json(send, 404, {"error": "not found"})
+        return
+
+    try:
+        body = await _read_body(receive)
+        if len(body) > INLINE_BODY_SIZE:
+            result = await asyncio.get_running_loop().run_in_executor(None, _handle, handler, body)
+        else:
+            result = _handle(handler, body)
+    except RequestError as e:
+        await _send_json(send, e.status, {"error": e.message, "details": e.errors})
+        return
+    await _send(send, 200, result, b"application/json")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("lending.service:app", host="0.0.0.0", port=8000)
@@ -0,0 +1,240 @@
+"""Per-session result store with a size cap and idle eviction.
+
+Streamlit keeps every browser session's ``st.session_state`` for as long as
+the session lives, and nothing in it is shared. The dashboard therefore
+keeps only small inputs there (the applicant, flags, widget values) and puts
+derived results that can be recomputed (scores, reports, portfolio
+summaries) in the process-wide ``session_store``:
+
+    results = session_store.session(st.session_state)
+    results.put("report", (key, data))
+    results.get("report")
+
+Each session's results are capped at ``MAX_SESSION_BYTES``; past it, the
+least recently used results are dropped. A session that hasn't rerun for
+``SESSION_TTL`` seconds loses all its results; a result can come with an
+``on_evict`` callback, e.g. to delete a temporary file. Idle sessions are
+swept when any session reruns, at most every ``SWEEP_INTERVAL`` seconds.
+
+Sizes are estimated with ``footprint``, which counts arrays and buffers
+deeply and treats read-only arrays (such as the shared default applicant)
+as shared. Exported metrics: ``lending_sessions``,
+``lending_session_bytes`` (results and session state of every session),
+``lending_session_bytes_max`` (the largest session) and
+``lending_session_evictions_total`` by reason.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import types
+import uuid
+from collections import OrderedDict
+
+from lending.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Seconds without a rerun after which a session's results are dropped
+SESSION_TTL = float(os.environ.get("LENDING_SESSION_TTL", 30 * 60))
+
+# Bytes of results kept per session before the least recently used are dropped
+MAX_SESSION_BYTES = int(os.environ.get("LENDING_SESSION_MAX_BYTES", 32 * 2**20))
+
+# Seconds between sweeps for idle sessions
+SWEEP_INTERVAL = 60.0
+
+# st.session_state key holding the session's id in the store
+SESSION_KEY = "session_key"
+
+SESSION_EVICTIONS = registry.counter(
+    "lending_session_evictions_total", "Session results dropped", labelnames=("reason",)
+)
+
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def footprint(obj, _seen=None):
+    """Approximate bytes held by ``obj``, following containers and object attributes."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen or isinstance(obj, _OPAQUE):
+        return 0
+    seen.add(id(obj))
+    # Imported by app.py, so NumPy is only looked up once something else has loaded it
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(obj, np.ndarray):
+        # Read-only arrays are shared (defaults) or mapped from disk (populations)
+        return 0 if not obj.flags.writeable else sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(footprint(k, seen) + footprint(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(footprint(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += footprint(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        size += footprint(getattr(obj, slot, None), seen)
+    return size
+
+
+class _Session:
+    __slots__ = ("last_seen", "state_bytes", "results")
+
+    def __init__(self, now):
+        self.last_seen = now
+        self.state_bytes = 0
+        self.results = OrderedDict()  # name -> (value, size, on_evict), least recently used first
+
+    @property
+    def result_bytes(self):
+        return sum(size for _, size, _ in self.results.values())
+
+
+def _evict(name, entry, reason=None):
+    # Counted as an eviction only if the store dropped it, not the page
+    value, _, on_evict = entry
+    if reason is not None:
+        SESSION_EVICTIONS.inc(reason=reason)
+    if on_evict is not None:
+        try:
+            on_evict(value)
+        except Exception:
+            logger.exception("Evicting session result %s failed", name)
+
+
+class SessionResults:
+    """One session's results in a ``SessionStore``."""
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+
+    def get(self, name, default=None):
+        return self.store.get(self.key, name, default)
+
+    def put(self, name, value, on_evict=None):
+        self.store.put(self.key, name, value, on_evict)
+
+    def pop(self, name, default=None):
+        return self.store.pop(self.key, name, default)
+
+    def __contains__(self, name):
+        return self.store.get(self.key, name, self) is not self
+
+    @property
+    def nbytes(self):
+        """Bytes held by this session: its results and its recorded session state."""
+        return self.store.session_bytes(self.key)
+
+
+class SessionStore:
+    """Process-wide results of every session; see the module docstring."""
+
+    def __init__(self, ttl=SESSION_TTL, max_session_bytes=MAX_SESSION_BYTES, sweep_interval=SWEEP_INTERVAL):
+        self.ttl = ttl
+        self.max_session_bytes = max_session_bytes
+        self.sweep_interval = sweep_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _session(self, key):
+        # The caller holds the lock
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = _Session(time.monotonic())
+        return session
+
+    def session(self, state):
+        """The results of the session owning ``state`` (``st.session_state``), marked as active."""
+        key = state.get(SESSION_KEY)
+        if key is None:
+            key = state[SESSION_KEY] = uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            self._session(key).last_seen = now
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+        return SessionResults(self, key)
+
+    def track(self, state):
+        """``session`` that also records the size of ``state`` itself; call once per rerun."""
+        results = self.session(state)
+        state_bytes = footprint({name: state[name] for name in list(state.keys())})
+        with self._lock:
+            self._session(results.key).state_bytes = state_bytes
+        return results
+
+    def get(self, key, name, default=None):
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None or name not in session.results:
+                return default
+            session.results.move_to_end(name)
+            return session.results[name][0]
+
+    def put(self, key, name, value, on_evict=None):
+        """Keep ``value``, dropping this session's least recently used results past the cap."""
+        size = footprint(value)
+        evicted = []
+        with self._lock:
+            session = self._session(key)
+            previous = session.results.pop(name, None)
+            if previous is not None and previous[0] is not value:
+                evicted.append((name, previous, None))
+            session.results[name] = (value, size, on_evict)
+            total = session.result_bytes
+            while total > self.max_session_bytes and len(session.results) > 1:
+                oldest, entry = session.results.popitem(last=False)
+                total -= entry[1]
+                evicted.append((oldest, entry, "size"))
+        for entry in evicted:
+            _evict(*entry)
+
+    def pop(self, key, name, default=None):
+        """Remove a result, running its ``on_evict`` callback."""
+        with self._lock:
+            session = self._sessions.get(key)
+            entry = None if session is None else session.results.pop(name, None)
+        if entry is None:
+            return default
+        _evict(name, entry)
+        return entry[0]
+
+    def sweep(self, now=None):
+        """Drop the results of sessions idle for longer than the TTL; returns how many."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            idle = [key for key, session in self._sessions.items() if now - session.last_seen > self.ttl]
+            dropped = [self._sessions.pop(key) for key in idle]
+        for session in dropped:
+            for name, entry in session.results.items():
+                _evict(name, entry, "idle")
+        return len(dropped)
+
+    def session_bytes(self, key):
+        with self._lock:
+            session = self._sessions.get(key)
+            return 0 if session is None else session.state_bytes + session.result_bytes
+
+    def stats(self):
+        """Number of sessions, their total bytes and the largest session's bytes."""
+        with self._lock:
+            sizes = [session.state_bytes + session.result_bytes for session in self._sessions.values()]
+        return {"sessions": len(sizes), "bytes": sum(sizes), "max_session_bytes": max(sizes, default=0)}
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+session_store = SessionStore()
+
+registry.gauge("lending_sessions", "Sessions with state in this process", lambda: len(session_store))
+registry.gauge("lending_session_bytes", "Estimated bytes held by every session",
+               lambda: session_store.stats()["bytes"])
+registry.gauge("lending_session_bytes_max", "Estimated bytes held by the largest session",
+               lambda: session_store.stats()["max_session_bytes"])
@@ -0,0 +1,249 @@
+"""Champion/challenger shadow scoring.
+
+While a new model is being rolled out it can shadow the active (champion)
+model: name it in the model directory's ``CHALLENGER`` file, e.g. with
+``python -m lending.models challenge <version>``. Every submission is then
+also scored by the challenger in a separate process, so its CPU time never
+competes for the GIL with the page or service threads that scored the
+submission; a background thread only hands batches to that process and
+records the results. Only the champion's decision is ever shown or
+recorded; the challenger's is compared with it and logged:
+
+- ``lending_shadow_scored_total`` and ``lending_shadow_eligibility_flips_total``
+  give the eligibility flip rate,
+- ``lending_shadow_risk_level_changes_total`` counts changed risk levels,
+- ``lending_shadow_prob_delta`` is a histogram of the absolute default
+  probability difference,
+- one JSON line per application is appended to ``LENDING_SHADOW_LOG`` if set.
+
+Submitting only copies the feature rows and queues them, so a slow
+challenger never delays the page. If the challenger can't keep up, batches
+beyond ``MAX_PENDING`` are dropped (and counted) rather than queued without
+bound. Set ``LENDING_SHADOW_PROCESS=0`` to score on the background thread
+instead; ``benchmarks/stream.py --shadow`` measures the difference.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import numpy as np
+
+from lending.metrics import registry
+from lending.models import model_registry
+from lending.scoring import ELIGIBILITY, score_batch
+
+logger = logging.getLogger(__name__)
+
+# JSON lines file of per-application comparisons, if set
+SHADOW_LOG = os.environ.get("LENDING_SHADOW_LOG")
+
+# Submitted batches waiting for the challenger before new ones are dropped
+MAX_PENDING = 1_000
+
+# Score in a separate process rather than on the background thread
+SHADOW_PROCESS = os.environ.get("LENDING_SHADOW_PROCESS", "1") != "0"
+
+DELTA_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+SHADOW_ROWS = registry.counter(
+    "lending_shadow_scored_total", "Applications scored by the challenger model", labelnames=("challenger",)
+)
+SHADOW_FLIPS = registry.counter(
+    "lending_shadow_eligibility_flips_total", "Applications whose eligibility the challenger would change",
+    labelnames=("challenger",),
+)
+SHADOW_RISK_CHANGES = registry.counter(
+    "lending_shadow_risk_level_changes_total", "Applications whose risk level the challenger would change",
+    labelnames=("challenger",),
+)
+SHADOW_DELTA = registry.histogram(
+    "lending_shadow_prob_delta", "Absolute default probability difference, challenger vs champion",
+    labelnames=("challenger",), buckets=DELTA_BUCKETS,
+)
+SHADOW_DROPPED = registry.counter(
+    "lending_shadow_dropped_total", "Shadow batches dropped because the challenger fell behind"
+)
+SHADOW_ERRORS = registry.counter(
+    "lending_shadow_errors_total", "Shadow batches the challenger failed to score", labelnames=("challenger",)
+)
+
+
+# Models the shadow process was last sent, by cache_key; only models it
+# doesn't already hold are pickled with a batch
+_worker_models = {}
+
+
+def _score_models(features, models):
+    # Runs in the shadow process; models: [(cache_key, model, or None if already sent)]
+    global _worker_models
+    _worker_models = {key: _worker_models[key] if model is None else model for key, model in models}
+    return [score_batch(features, _worker_models[key]) for key, _ in models]
+
+
+class ShadowScorer:
+    """Scores submissions with the challenger model off the request path.
+
+    Batches are queued to a background thread, which has them scored in a
+    single-worker process (started on first use) unless ``process`` is false.
+    """
+
+    def __init__(self, models=model_registry, max_pending=MAX_PENDING, log_path=SHADOW_LOG,
+                 process=SHADOW_PROCESS):
+        self.models = models
+        self.max_pending = max_pending
+        self.log_path = log_path
+        self.process = process
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        # Only used from the background thread
+        self._pool = None
+        self._sent = set()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._stats = {}  # challenger version -> running totals
+        self._log_lock = threading.Lock()
+        registry.gauge("lending_shadow_pending", "Shadow batches waiting for the challenger", lambda: self._pending)
+
+    def submit(self, features, champion, champion_scores=None, application_ids=None):
+        """Queue ``features`` (an ``(n, 30)`` array) to be scored by the challenger.
+
+        ``champion`` is the model that made the decision and ``champion_scores``
+        its ``BatchScore``, if already computed. Returns immediately; ``False``
+        if nothing was queued (no challenger, or the queue is full).
+        """
+        challenger = self.models.challenger()
+        if challenger is None or challenger.cache_key == champion.cache_key:
+            return False
+        with self._idle:
+            if self._pending >= self.max_pending:
+                SHADOW_DROPPED.inc()
+                return False
+            self._pending += 1
+        # Copied so the caller can go on using its arrays
+        features = np.array(features, dtype=np.float64, ndmin=2)
+        if application_ids is not None:
+            application_ids = list(application_ids)
+        self._executor.submit(self._run, features, champion, champion_scores, challenger, application_ids)
+        return True
+
+    def _run(self, features, champion, champion_scores, challenger, application_ids):
+        try:
+            if champion_scores is None:
+                champion_scores, challenger_scores = self._score(features, [champion, challenger])
+            else:
+                [challenger_scores] = self._score(features, [challenger])
+            self._record(champion, champion_scores, challenger, challenger_scores, application_ids)
+        except Exception:
+            SHADOW_ERRORS.inc(challenger=challenger.version)
+            logger.exception("Shadow scoring with %s failed", challenger.version)
+        finally:
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+
+    def _score(self, features, models):
+        # One BatchScore per model
+        if not self.process:
+            return [score_batch(features, model) for model in models]
+        if self._pool is None:
+            # Spawned rather than forked: the dashboard and service run threads
+            self._pool = ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"))
+            self._sent = set()
+        keys = [model.cache_key for model in models]
+        sent, self._sent = self._sent, set()
+        try:
+            scores = self._pool.submit(
+                _score_models, features, [(key, None if key in sent else model) for key, model in zip(keys, models)]
+            ).result()
+        except BrokenProcessPool:
+            # The process died; the next batch starts a new one
+            self._pool = None
+            raise
+        self._sent = set(keys)
+        return scores
+
+    def _record(self, champion, champion_scores, challenger, challenger_scores, application_ids):
+        version = challenger.version
+        delta = challenger_scores.default_prob - champion_scores.default_prob
+        flips = challenger_scores.eligibility != champion_scores.eligibility
+        changes = challenger_scores.risk_level != champion_scores.risk_level
+
+        SHADOW_ROWS.inc(len(delta), challenger=version)
+        SHADOW_FLIPS.inc(int(flips.sum()), challenger=version)
+        SHADOW_RISK_CHANGES.inc(int(changes.sum()), challenger=version)
+        for value in np.abs(delta).tolist():
+            SHADOW_DELTA.observe(value, challenger=version)
+
+        with self._idle:
+            stats = self._stats.setdefault(version, {
+                "champion": champion.version, "scored": 0, "eligibility_flips": 0, "risk_level_changes": 0,
+                "delta_sum": 0.0, "abs_delta_sum": 0.0, "max_abs_delta": 0.0,
+            })
+            stats["champion"] = champion.version
+            stats["scored"] += len(delta)
+            stats["eligibility_flips"] += int(flips.sum())
+            stats["risk_level_changes"] += int(changes.sum())
+            stats["delta_sum"] += float(delta.sum())
+            stats["abs_delta_sum"] += float(np.abs(delta).sum())
+            stats["max_abs_delta"] = max(stats["max_abs_delta"], float(np.abs(delta).max(initial=0.0)))
+
+        if self.log_path:
+            self._log(champion, champion_scores, challenger, challenger_scores, application_ids)
+
+    def _log(self, champion, champion_scores, challenger, challenger_scores, application_ids):
+        now = time.time()
+        ids = application_ids or [None] * len(champion_scores.default_prob)
+        lines = [
+            json.dumps({
+                "time": now,
+                "application_id": application_id,
+                "champion": champion.version,
+                "challenger": challenger.version,
+                "champion_prob": champion_prob,
+                "challenger_prob": challenger_prob,
+                "champion_eligibility": ELIGIBILITY[champion_eligibility][0],
+                "challenger_eligibility": ELIGIBILITY[challenger_eligibility][0],
+            })
+            for application_id, champion_prob, challenger_prob, champion_eligibility, challenger_eligibility in zip(
+                ids,
+                champion_scores.default_prob.tolist(), challenger_scores.default_prob.tolist(),
+                champion_scores.eligibility.tolist(), challenger_scores.eligibility.tolist(),
+            )
+        ]
+        with self._log_lock, open(self.log_path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def stats(self):
+        """Agreement so far, per challenger version.
+
+        Each entry has the application count, eligibility flip rate, risk
+        level change rate and mean, mean absolute and maximum absolute
+        default probability deltas.
+        """
+        with self._idle:
+            totals = {version: dict(stats) for version, stats in self._stats.items()}
+        summary = {}
+        for version, stats in totals.items():
+            n = max(stats["scored"], 1)
+            summary[version] = {
+                "champion": stats["champion"],
+                "scored": stats["scored"],
+                "eligibility_flip_rate": stats["eligibility_flips"] / n,
+                "risk_level_change_rate": stats["risk_level_changes"] / n,
+                "mean_delta": stats["delta_sum"] / n,
+                "mean_abs_delta": stats["abs_delta_sum"] / n,
+                "max_abs_delta": stats["max_abs_delta"],
+            }
+        return summary
+
+    def join(self, timeout=None):
+        """Wait until every queued batch has been scored; ``False`` on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+
+shadow_scorer = ShadowScorer()
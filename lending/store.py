@@ -0,0 +1,251 @@
+"""Persistent store of submitted applications and their decisions.
+
+Every scored application is kept in a local SQLite database: its feature
+vector (the 240-byte ``Applicant`` record), default probability, risk level,
+eligibility and raised risk factors (as a bit mask), the version of the model
+that scored it, and the time it was recorded. Lookups go through indexes, so they stay instant at tens of
+millions of records:
+
+- by application id (the primary key),
+- by date range (``applications_created_at``),
+- by risk level within a date range (``applications_risk_level``).
+
+Single submissions are written straight away so the id can be shown to the
+user; batches are written with ``executemany`` in one transaction.
+
+The database lives at ``~/.local/share/lending-dashboard/applications.db``
+unless ``LENDING_STORE_PATH`` is set.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from lending.applicant import Applicant
+from lending.scoring import ELIGIBILITY, HEURISTIC_VERSION, RISK_FACTORS, RISK_LEVELS, confidence, score_batch
+
+STORE_PATH = Path(os.environ.get(
+    "LENDING_STORE_PATH", Path.home() / ".local" / "share" / "lending-dashboard" / "applications.db"
+))
+
+# Rows per executemany call when writing a batch
+WRITE_BATCH_SIZE = 50_000
+
+# Rows returned by the date and risk level lookups unless asked otherwise
+DEFAULT_LIMIT = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    default_prob REAL NOT NULL,
+    risk_level INTEGER NOT NULL,
+    eligibility INTEGER NOT NULL,
+    risk_factors INTEGER NOT NULL,
+    features BLOB NOT NULL,
+    model TEXT NOT NULL DEFAULT 'heuristic'
+);
+CREATE INDEX IF NOT EXISTS applications_created_at ON applications (created_at);
+CREATE INDEX IF NOT EXISTS applications_risk_level ON applications (risk_level, created_at);
+"""
+
+# Columns added since the first release, with their definitions; databases
+# created before them are migrated when opened
+MIGRATIONS = {"model": "TEXT NOT NULL DEFAULT 'heuristic'"}
+
+_COLUMNS = "id, created_at, default_prob, risk_level, eligibility, risk_factors, features, model"
+
+# Bit i of the risk_factors mask is RISK_FACTORS[i]
+_FACTOR_BITS = 1 << np.arange(len(RISK_FACTORS), dtype=np.int64)
+
+
+class Decision(NamedTuple):
+    id: int
+    created_at: datetime
+    applicant: Applicant
+    default_prob: float
+    risk_level: str
+    eligibility: str
+    risk_factors: list
+    model: str
+
+    @classmethod
+    def from_row(cls, row):
+        id, created_at, default_prob, risk_level, eligibility, mask, features, model = row
+        return cls(
+            id,
+            datetime.fromtimestamp(created_at, tz=timezone.utc),
+            Applicant.from_bytes(features),
+            default_prob,
+            RISK_LEVELS[risk_level][0],
+            ELIGIBILITY[eligibility][0],
+            [factor for i, factor in enumerate(RISK_FACTORS) if mask >> i & 1],
+            model,
+        )
+
+    def prediction(self):
+        """The decision as it was issued, in the display dict ``score_applicant`` returns."""
+        risk_color = dict(RISK_LEVELS)[self.risk_level]
+        eligible_color, eligible_text = {label: rest for label, *rest in ELIGIBILITY}[self.eligibility]
+        return {
+            "default_prob": self.default_prob,
+            "risk_level": self.risk_level,
+            "risk_color": risk_color,
+            "eligible": self.eligibility,
+            "eligible_color": eligible_color,
+            "eligible_text": eligible_text,
+            "risk_factors": list(self.risk_factors),
+            "confidence": int(confidence(len(self.risk_factors))),
+            "model": self.model,
+        }
+
+
+def _timestamp(value):
+    # Dates are taken as local midnight and naive datetimes as local time,
+    # matching the calendar days the Past Decisions page offers
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value.timestamp()
+
+
+class ApplicationStore:
+    """Indexed store of scored applications, safe to share between threads.
+
+    Each thread reads through its own connection; writes are serialized by a
+    process-wide lock.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # WAL lets readers run while a batch is being written
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._initialized:
+                with self._write_lock:
+                    conn.executescript(SCHEMA)
+                    existing = {row[1] for row in conn.execute("PRAGMA table_info(applications)")}
+                    for column, definition in MIGRATIONS.items():
+                        if column not in existing:
+                            conn.execute(f"ALTER TABLE applications ADD COLUMN {column} {definition}")
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def _insert(self, rows):
+        # rows: iterable of chunks of (created_at, default_prob, risk_level,
+        # eligibility, risk_factors, features, model) tuples;
+        # returns the id of the first row. Ids are assigned here, under the
+        # write lock, so a batch gets consecutive ids
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM applications").fetchone()[0]
+                next_id = first
+                for chunk in rows:
+                    conn.executemany(
+                        f"INSERT INTO applications ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        ((next_id + i,) + row for i, row in enumerate(chunk)),
+                    )
+                    next_id += len(chunk)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return first
+
+    def add(self, applicant, created_at=None, model=None):
+        """Score and record one application (an ``Applicant`` or feature dict); returns its id."""
+        if not isinstance(applicant, Applicant):
+            applicant = Applicant.from_dict(applicant)
+        return self.add_many(applicant.values[np.newaxis, :], created_at=created_at, model=model)
+
+    def add_many(self, features, scores=None, created_at=None, model=None):
+        """Record a batch of applications and return the id of the first one.
+
+        ``features`` is an ``(n, 30)`` array in ``top_30_features`` order and
+        ``scores`` its ``BatchScore`` from ``model`` (``None`` for the
+        heuristic); the batch gets consecutive ids.
+        """
+        features = np.ascontiguousarray(features, dtype="<f8")
+        if scores is None:
+            scores = score_batch(features, model)
+        version = HEURISTIC_VERSION if model is None else model.version
+        created_at = time.time() if created_at is None else _timestamp(created_at)
+        masks = scores.risk_factors.astype(np.int64) @ _FACTOR_BITS
+
+        def chunks():
+            for start in range(0, len(features), WRITE_BATCH_SIZE):
+                stop = start + WRITE_BATCH_SIZE
+                yield list(zip(
+                    [created_at] * len(features[start:stop]),
+                    scores.default_prob[start:stop].tolist(),
+                    scores.risk_level[start:stop].tolist(),
+                    scores.eligibility[start:stop].tolist(),
+                    masks[start:stop].tolist(),
+                    (row.tobytes() for row in features[start:stop]),
+                    [version] * len(features[start:stop]),
+                ))
+
+        return self._insert(chunks())
+
+    def get(self, application_id):
+        """The ``Decision`` recorded as ``application_id``, or ``None``."""
+        row = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM applications WHERE id = ?", (int(application_id),)
+        ).fetchone()
+        return None if row is None else Decision.from_row(row)
+
+    def by_date(self, start=None, end=None, limit=DEFAULT_LIMIT):
+        """Decisions recorded in ``[start, end)``, newest first; naive bounds are local time."""
+        return self._query("", (), start, end, limit)
+
+    def by_risk_level(self, risk_level, start=None, end=None, limit=DEFAULT_LIMIT):
+        """Decisions with the given risk level (label or index), newest first."""
+        if isinstance(risk_level, str):
+            risk_level = [label for label, _ in RISK_LEVELS].index(risk_level)
+        return self._query("risk_level = ?", (risk_level,), start, end, limit)
+
+    def _query(self, where, params, start, end, limit):
+        clauses = [where] if where else []
+        params = list(params)
+        if start is not None:
+            clauses.append("created_at >= ?")
+            params.append(_timestamp(start))
+        if end is not None:
+            clauses.append("created_at < ?")
+            params.append(_timestamp(end))
+        sql = f"SELECT {_COLUMNS} FROM applications"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [Decision.from_row(row) for row in self._connection().execute(sql, params)]
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+application_store = ApplicationStore()
@@ -0,0 +1,482 @@
+"""Streaming consumer: score application records from a queue and emit decisions.
+
+A ``StreamConsumer`` reads application records from a ``Source`` and gathers
+them into micro-batches of up to ``BATCH_SIZE`` records, or whatever arrived
+within ``MAX_WAIT`` seconds of the first one. Each micro-batch is scored in
+one ``score_batch`` call with the active model, one decision per record is
+written to a ``Sink``, and only then are the records acknowledged to the
+source. A failure before the acknowledgement hands the batch back to the
+source for redelivery, so every record gets at least one decision (rarely
+two, after a crash; decisions echo the record's ``id`` for deduplication).
+Redelivery is bounded: on a batch's ``MAX_ATTEMPTS``-th delivery its records
+are scored one at a time, so a record that can't be scored is answered with
+an error instead of holding up the stream, and if the sink still fails the
+records go to the ``dead_letter`` sink, when there is one.
+
+Records are JSON objects of features, as for the scoring service, with an
+optional ``"id"``. Decisions carry the same fields as a service response, or
+``errors`` for a record that failed validation; such records are answered
+and acknowledged, not retried.
+
+Backpressure: the consumer only pulls the next batch once the previous one
+is written, so a slow sink slows reading down, and a ``MemoryQueue`` blocks
+producers once ``maxsize`` records are queued or in flight.
+
+Transports implement ``Source`` and ``Sink``; other brokers plug in the same
+way. Included are:
+
+- ``MemoryQueue``: a bounded in-process queue, both a source and a sink,
+- ``JsonLinesSource``: tails a JSON lines file, committing the read offset
+  to a sidecar file on acknowledgement so a restart resumes where it left off,
+- ``JsonLinesSink``: appends decisions to a JSON lines file, synced to disk
+  before the batch is acknowledged.
+
+    python -m lending.stream applications.jsonl decisions.jsonl
+"""
+import argparse
+import collections
+import json
+import logging
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+
+from lending.metrics import registry, timed
+from lending.models import model_registry
+from lending.scoring import score_batch
+from lending.shadow import shadow_scorer
+from lending.validation import VALIDATOR, parse_records
+
+logger = logging.getLogger(__name__)
+
+# Most records scored in one call
+BATCH_SIZE = 500
+
+# Seconds to wait for a batch to fill after its first record arrives
+MAX_WAIT = 0.05
+
+# Seconds to wait for a first record before polling again
+IDLE_TIMEOUT = 1.0
+
+# Seconds to wait before retrying a batch that failed
+RETRY_DELAY = 1.0
+
+# Deliveries of a failing batch before its records are isolated or dead-lettered
+MAX_ATTEMPTS = 3
+
+# Records a MemoryQueue holds, queued or in flight, before put() blocks
+QUEUE_SIZE = 10_000
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STREAM_RECORDS = registry.counter("lending_stream_records_total", "Records answered by the stream consumer")
+STREAM_INVALID = registry.counter(
+    "lending_stream_invalid_total", "Records answered with validation errors instead of a decision"
+)
+STREAM_RETRIES = registry.counter(
+    "lending_stream_retries_total", "Micro-batches handed back to the source after a failure"
+)
+STREAM_FAILED = registry.counter(
+    "lending_stream_failed_total", "Records answered with an error because they could not be scored"
+)
+STREAM_DEAD_LETTERED = registry.counter(
+    "lending_stream_dead_lettered_total", "Records written to the dead letter sink"
+)
+STREAM_BATCH_SIZE = registry.histogram(
+    "lending_stream_batch_size", "Records per micro-batch", buckets=(1, 10, 50, 100, 250, 500, 1000, 5000)
+)
+STREAM_LATENCY = registry.histogram(
+    "lending_stream_latency_seconds", "Time from a batch's first record being received to its acknowledgement",
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class Message(NamedTuple):
+    token: object  # the source's acknowledgement handle
+    body: object  # a JSON text (str or bytes) or an already decoded record
+
+
+class Source:
+    """Where application records come from."""
+
+    def receive(self, max_records, timeout):
+        """Return up to ``max_records`` messages, waiting at most ``timeout`` seconds for any."""
+        raise NotImplementedError
+
+    def ack(self, messages):
+        """Mark messages as answered; they are not delivered again."""
+        raise NotImplementedError
+
+    def release(self, messages):
+        """Hand back unanswered messages to be delivered again."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class Sink:
+    """Where decisions go."""
+
+    def write(self, decisions):
+        """Write a list of decision dicts durably, or raise."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryQueue(Source, Sink):
+    """A bounded in-process queue of records.
+
+    ``put`` blocks while ``maxsize`` records are queued or received but not
+    yet acknowledged. Written decisions are queued like records, so one
+    consumer's sink can be the next one's source.
+    """
+
+    def __init__(self, maxsize=QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._ready = collections.deque()
+        self._in_flight = {}
+        self._next_token = 0
+        self._changed = threading.Condition()
+
+    def __len__(self):
+        with self._changed:
+            return len(self._ready) + len(self._in_flight)
+
+    def put(self, record, timeout=None):
+        """Queue a record; returns ``False`` if the queue stayed full for ``timeout`` seconds."""
+        with self._changed:
+            if not self._changed.wait_for(lambda: len(self._ready) + len(self._in_flight) < self.maxsize,
+                                          timeout):
+                return False
+            self._ready.append(Message(self._next_token, record))
+            self._next_token += 1
+            self._changed.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Take one record off the queue without acknowledgement, or ``None`` on timeout."""
+        messages = self.receive(1, timeout)
+        if not messages:
+            return None
+        self.ack(messages)
+        return messages[0].body
+
+    def receive(self, max_records, timeout):
+        with self._changed:
+            if not self._changed.wait_for(lambda: self._ready, timeout):
+                return []
+            messages = [self._ready.popleft() for _ in range(min(max_records, len(self._ready)))]
+            self._in_flight.update((message.token, message) for message in messages)
+            return messages
+
+    def ack(self, messages):
+        with self._changed:
+            for message in messages:
+                self._in_flight.pop(message.token, None)
+            self._changed.notify_all()
+
+    def release(self, messages):
+        with self._changed:
+            for message in reversed(messages):
+                if self._in_flight.pop(message.token, None) is not None:
+                    self._ready.appendleft(message)
+            self._changed.notify_all()
+
+    def write(self, decisions):
+        for decision in decisions:
+            self.put(decision)
+
+
+class JsonLinesSource(Source):
+    """Tails a JSON lines file, one record per line.
+
+    The offset after the last acknowledged line is committed to
+    ``offset_path`` (default ``<path>.offset``), and reading resumes there.
+    A line is only read once its newline has been written. If the file is
+    truncated, reading starts again from the top.
+    """
+
+    def __init__(self, path, offset_path=None, poll_interval=0.05):
+        self.path = os.fspath(path)
+        self.offset_path = offset_path or self.path + ".offset"
+        self.poll_interval = poll_interval
+        try:
+            with open(self.offset_path) as f:
+                self.committed = int(f.read().strip() or 0)
+        except FileNotFoundError:
+            self.committed = 0
+        self._file = None
+        self._position = self.committed
+
+    def _open(self):
+        if self._file is None:
+            try:
+                self._file = open(self.path, "rb")
+            except FileNotFoundError:
+                return None
+            self._file.seek(self._position)
+        if os.fstat(self._file.fileno()).st_size < self._position:
+            logger.warning("%s was truncated; reading it from the start", self.path)
+            self._position = self.committed = 0
+            self._file.seek(0)
+        return self._file
+
+    def receive(self, max_records, timeout):
+        deadline = time.monotonic() + timeout
+        messages = []
+        while True:
+            f = self._open()
+            while f is not None and len(messages) < max_records:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    f.seek(self._position)  # not finished writing yet
+                    break
+                self._position += len(line)
+                if line.strip():
+                    messages.append(Message(self._position, line))
+            if messages or time.monotonic() >= deadline:
+                return messages
+            time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+
+    def ack(self, messages):
+        if not messages:
+            return
+        self.committed = max(self.committed, max(message.token for message in messages))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.offset_path)), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(str(self.committed))
+        os.replace(tmp, self.offset_path)
+
+    def release(self, messages):
+        # Everything after the last commit is read again
+        self._position = self.committed
+        if self._file is not None:
+            self._file.seek(self._position)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonLinesSink(Sink):
+    """Appends decisions to a JSON lines file, synced to disk on every write."""
+
+    def __init__(self, path, fsync=True):
+        self.path = os.fspath(path)
+        self.fsync = fsync
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, decisions):
+        self._file.write("".join(json.dumps(decision) + "\n" for decision in decisions))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _text(body):
+    # The record as written, for the dead letter sink
+    return body.decode("utf-8", "replace").rstrip("\n") if isinstance(body, bytes) else body
+
+
+def _decode(body):
+    # A record dict, or None if the body isn't a JSON object
+    if isinstance(body, (str, bytes)):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return None
+    return body if isinstance(body, dict) else None
+
+
+class StreamConsumer:
+    """Scores micro-batches from ``source`` and writes decisions to ``sink``.
+
+    ``store``, an ``ApplicationStore``, also records every scored
+    application; its id is added to the decision as ``application_id``.
+    ``dead_letter`` is a ``Sink`` for the records of a batch whose decisions
+    could not be written ``max_attempts`` times.
+    """
+
+    def __init__(self, source, sink, batch_size=BATCH_SIZE, max_wait=MAX_WAIT, models=model_registry,
+                 shadow=shadow_scorer, store=None, dead_letter=None, max_attempts=MAX_ATTEMPTS):
+        self.source = source
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.models = models
+        self.shadow = shadow
+        self.store = store
+        self.dead_letter = dead_letter
+        self.max_attempts = max_attempts
+        self.answered = 0
+        self._attempts = (None, 0)  # first message token of the failing batch, deliveries so far
+
+    def _collect(self, idle_timeout):
+        # First record, then whatever else arrives within the batch window
+        batch = self.source.receive(self.batch_size, idle_timeout)
+        if not batch:
+            return batch, None
+        received = time.monotonic()
+        deadline = received + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            more = self.source.receive(self.batch_size - len(batch), remaining)
+            if not more:
+                break
+            batch.extend(more)
+        return batch, received
+
+    @timed("stream.batch")
+    def decide(self, bodies):
+        """One decision dict per record body, in order."""
+        records = [_decode(body) for body in bodies]
+        ids = [None if record is None else record.get("id") for record in records]
+        features = [None if record is None else {k: v for k, v in record.items() if k != "id"}
+                    for record in records]
+        values, errors = parse_records(features)
+        errors += VALIDATOR.validate(values).errors()
+
+        decisions = [{"id": record_id} for record_id in ids]
+        for error in errors:
+            i = error.pop("index")
+            if records[i] is None:
+                error["error"] = "record must be a JSON object"
+            decisions[i].setdefault("errors", []).append(error)
+        valid = [i for i, decision in enumerate(decisions) if "errors" not in decision]
+        STREAM_INVALID.inc(len(decisions) - len(valid))
+        if not valid:
+            return decisions
+
+        rows = values[valid]
+        model = self.models.active()
+        scores = score_batch(rows, model)
+        if self.shadow is not None:
+            self.shadow.submit(rows, model, scores)
+        application_ids = [None] * len(valid)
+        if self.store is not None:
+            first_id = self.store.add_many(rows, scores, model=model)
+            application_ids = range(first_id, first_id + len(valid))
+        for i, result, application_id in zip(valid, scores.to_dicts(model.version), application_ids):
+            decisions[i].update(result)
+            if application_id is not None:
+                decisions[i]["application_id"] = application_id
+        return decisions
+
+    def _decide_each(self, bodies):
+        # One record at a time, answering the ones that fail with an error
+        decisions = []
+        for body in bodies:
+            try:
+                decisions.extend(self.decide([body]))
+            except Exception:
+                logger.exception("Record could not be scored: %.200s", _text(body))
+                STREAM_FAILED.inc()
+                record = _decode(body)
+                decisions.append({"id": None if record is None else record.get("id"),
+                                  "errors": [{"error": "record could not be scored"}]})
+        return decisions
+
+    def _write(self, decisions, bodies, attempts):
+        try:
+            self.sink.write(decisions)
+        except Exception as e:
+            if self.dead_letter is None or attempts < self.max_attempts:
+                raise
+            logger.exception("Writing decisions failed %d times; dead-lettering %d records", attempts, len(bodies))
+            self.dead_letter.write([{"record": _text(body), "error": repr(e)} for body in bodies])
+            STREAM_DEAD_LETTERED.inc(len(bodies))
+
+    def poll(self, idle_timeout=IDLE_TIMEOUT):
+        """Answer one micro-batch; returns the number of records, 0 if none arrived."""
+        batch, received = self._collect(idle_timeout)
+        if not batch:
+            return 0
+        # A redelivered batch starts with the same message
+        key, attempts = self._attempts
+        attempts = attempts + 1 if batch[0].token == key else 1
+        bodies = [message.body for message in batch]
+        try:
+            if attempts < self.max_attempts:
+                decisions = self.decide(bodies)
+            else:
+                decisions = self._decide_each(bodies)
+            self._write(decisions, bodies, attempts)
+        except BaseException:
+            self._attempts = (batch[0].token, attempts)
+            self.source.release(batch)
+            STREAM_RETRIES.inc()
+            raise
+        self._attempts = (None, 0)
+        self.source.ack(batch)
+        STREAM_RECORDS.inc(len(batch))
+        STREAM_BATCH_SIZE.observe(len(batch))
+        STREAM_LATENCY.observe(time.monotonic() - received)
+        self.answered += len(batch)
+        return len(batch)
+
+    def run(self, stop=None, idle_timeout=IDLE_TIMEOUT):
+        """Answer micro-batches until ``stop`` (a ``threading.Event``) is set.
+
+        A failed batch is logged and retried after ``RETRY_DELAY`` seconds,
+        up to ``max_attempts`` deliveries (see the module docstring).
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.poll(idle_timeout)
+            except Exception:
+                logger.exception("Micro-batch failed; retrying in %.0fs", RETRY_DELAY)
+                stop.wait(RETRY_DELAY)
+        return self.answered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score application records from a JSON lines file as they arrive.")
+    parser.add_argument("source", help="JSON lines file of applications to tail")
+    parser.add_argument("out", help="JSON lines file to append decisions to")
+    parser.add_argument("--offset-file", help="where the read offset is kept (default: <source>.offset)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT, help="batch window in seconds")
+    parser.add_argument("--dead-letter", help="JSON lines file for records whose decisions can't be written")
+    parser.add_argument("--record", action="store_true", help="also record decisions in the application store")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    store = None
+    if args.record:
+        from lending.store import application_store as store
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    source = JsonLinesSource(args.source, args.offset_file)
+    sink = JsonLinesSink(args.out)
+    dead_letter = JsonLinesSink(args.dead_letter) if args.dead_letter else None
+    consumer = StreamConsumer(source, sink, args.batch_size, args.max_wait, store=store, dead_letter=dead_letter)
+    logger.info("Consuming %s from offset %d", args.source, source.committed)
+    try:
+        answered = consumer.run(stop)
+    finally:
+        source.close()
+        sink.close()
+        if dead_letter is not None:
+            dead_letter.close()
+    logger.info("Answered %d records", answered)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
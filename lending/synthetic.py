@@ -0,0 +1,42 @@
+"""Synthetic applicant populations drawn from the ``feature_input_config`` ranges.
+
+Used by the benchmarks and for trying the batch tools without real data.
+Every value is a valid widget input: uniform between the feature's min and
+max, snapped to its step.
+"""
+import numpy as np
+
+from lending.schema import feature_input_config, top_30_features
+
+
+def synthetic_column(feature, n, rng):
+    config = feature_input_config[feature]
+    step = config.get("step", 1)
+    steps = int(round((config["max"] - config["min"]) / step))
+    values = config["min"] + rng.integers(0, steps + 1, size=n) * step
+    # Round away the float noise of min + k * step so values match what the
+    # widgets would produce (e.g. 0.28, not 0.28000000000000003)
+    return np.round(values.astype(np.float64), 6)
+
+
+def synthetic_applicants(n, seed=0, features=None):
+    """Return an ``(n, len(features))`` float64 array of synthetic applicants.
+
+    ``features`` defaults to ``top_30_features``, giving rows that
+    ``score_batch`` accepts directly.
+    """
+    features = top_30_features if features is None else features
+    rng = np.random.default_rng(seed)
+    out = np.empty((n, len(features)), dtype=np.float64)
+    for j, feature in enumerate(features):
+        out[:, j] = synthetic_column(feature, n, rng)
+    return out
+
+
+def synthetic_frame(n, seed=0, features=None):
+    """Like ``synthetic_applicants`` but as a DataFrame with feature columns."""
+    import pandas as pd
+
+    features = top_30_features if features is None else features
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({feature: synthetic_column(feature, n, rng) for feature in features})
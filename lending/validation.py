@@ -0,0 +1,252 @@
+"""Vectorized validation of applicant features.
+
+``VALIDATOR`` is compiled once from ``feature_input_config`` and
+``CROSS_FIELD_RULES`` and checks a whole batch of applicants at a time:
+
+- type: a value that isn't a number (DataFrame columns can hold anything),
+- missing: NaN; allowed unless asked otherwise, as scoring fills in the
+  feature's default,
+- range: outside the feature's ``[min, max]``,
+- integer: a fractional value for one of the ``count_features``,
+- cross-field: e.g. a credit card balance above the credit limit, checked
+  on the values that will be scored (missing values take their defaults).
+
+The result is a set of boolean masks (``ValidationResult``) rather than an
+exception at the first bad row, so flagging or dropping bad rows stays
+vectorized however many there are; error messages are only built for the
+rows that fail. ``clamp`` repairs a batch instead of rejecting it.
+"""
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from lending.applicant import Applicant
+from lending.schema import count_features, feature_index, feature_input_config, top_30_features
+
+
+class CrossField(NamedTuple):
+    feature: str
+    op: str  # "<=", "<", ">=" or ">"
+    other: str
+
+
+# Relations every consistent application satisfies
+CROSS_FIELD_RULES = [
+    CrossField("CREDIT_CARD_CUR_BAL_TOTAL", "<=", "CREDIT_CARD_CREDIT_LIMIT_TOTAL"),
+    CrossField("CREDIT_CARD_AVAILABLE_TOTAL", "<=", "CREDIT_CARD_CREDIT_LIMIT_TOTAL"),
+    CrossField("PAYMENT_MADE_CNT_TAGGED_TOTAL", "<=", "PAYMENT_MADE_CNT_TOTAL"),
+    CrossField("INQUIRY_RECENT_CNT_TOTAL", "<=", "INQUIRY_CNT_TOTAL"),
+    CrossField("AUTO_CREDIT_HISTORY_MONTHS_MAX_TOTAL", "<=", "ALL_CREDIT_HISTORY_MONTHS_TOTAL"),
+    CrossField("CASH_DOWN_CONTRACT_PERCENT", "<=", "TOTAL_DOWN_CONTRACT_PERCENT"),
+]
+
+_OPS = {
+    "<=": (np.less_equal, "must not exceed"),
+    "<": (np.less, "must be less than"),
+    ">=": (np.greater_equal, "must be at least"),
+    ">": (np.greater, "must be greater than"),
+}
+
+
+class ValidationResult(NamedTuple):
+    valid: np.ndarray  # bool, shape (n,)
+    not_numeric: np.ndarray  # bool, shape (n, 30)
+    missing: np.ndarray  # bool, shape (n, 30)
+    out_of_range: np.ndarray  # bool, shape (n, 30)
+    not_integer: np.ndarray  # bool, shape (n, 30)
+    inconsistent: np.ndarray  # bool, shape (n, len(CROSS_FIELD_RULES))
+    allow_missing: bool
+
+    def __len__(self):
+        return len(self.valid)
+
+    def counts(self):
+        """Number of rows failing each check, and of invalid rows overall."""
+        counts = {
+            "type": int(self.not_numeric.any(axis=1).sum()),
+            "range": int(self.out_of_range.any(axis=1).sum()),
+            "integer": int(self.not_integer.any(axis=1).sum()),
+            "cross_field": int(self.inconsistent.any(axis=1).sum()),
+            "invalid": int((~self.valid).sum()),
+        }
+        if not self.allow_missing:
+            counts["missing"] = int(self.missing.any(axis=1).sum())
+        return counts
+
+    def row_errors(self, i):
+        """``(feature, message)`` pairs for row ``i``."""
+        errors = []
+        for j in np.flatnonzero(self.not_numeric[i] | self.out_of_range[i] | self.not_integer[i]
+                                | (self.missing[i] & (not self.allow_missing))):
+            feature = top_30_features[j]
+            config = feature_input_config[feature]
+            if self.not_numeric[i, j]:
+                errors.append((feature, "value must be a number"))
+            elif self.missing[i, j]:
+                errors.append((feature, "value is missing"))
+            elif self.out_of_range[i, j]:
+                errors.append((feature, f"value must be between {config['min']} and {config['max']}"))
+            else:
+                errors.append((feature, "value must be a whole number"))
+        for k in np.flatnonzero(self.inconsistent[i]):
+            rule = CROSS_FIELD_RULES[k]
+            errors.append((rule.feature, f"value {_OPS[rule.op][1]} {rule.other}"))
+        return errors
+
+    def errors(self, limit=None, indexed=True):
+        """Error dicts (``index``, ``feature``, ``error``) for the invalid rows, in row order."""
+        errors = []
+        for i in np.flatnonzero(~self.valid)[:limit].tolist():
+            where = {"index": i} if indexed else {}
+            errors.extend(dict(where, feature=feature, error=error) for feature, error in self.row_errors(i))
+        return errors
+
+    def messages(self):
+        """One ``"FEATURE: error; ..."`` string per row, empty for valid rows."""
+        messages = np.full(len(self), "", dtype=object)
+        for i in np.flatnonzero(~self.valid).tolist():
+            messages[i] = "; ".join(f"{feature}: {error}" for feature, error in self.row_errors(i))
+        return messages
+
+
+class Validator:
+    """Validation compiled from a feature config; see the module docstring."""
+
+    def __init__(self, config=feature_input_config, cross_field=CROSS_FIELD_RULES):
+        self.mins = np.array([config[feature]["min"] for feature in top_30_features], dtype=np.float64)
+        self.maxs = np.array([config[feature]["max"] for feature in top_30_features], dtype=np.float64)
+        self.defaults = np.array([config[feature]["default"] for feature in top_30_features], dtype=np.float64)
+        self.integer = np.array([feature in count_features for feature in top_30_features])
+        self.cross_field = []
+        for rule in cross_field:
+            if rule.op not in _OPS:
+                raise ValueError(f"{rule.feature}: unsupported operator {rule.op!r}")
+            self.cross_field.append((feature_index[rule.feature], _OPS[rule.op][0], feature_index[rule.other]))
+
+    def matrix(self, frame):
+        """``(values, not_numeric)``: the ``(n, 30)`` float64 values of ``frame`` and its type errors.
+
+        ``frame`` is a DataFrame, a 2-D array in ``top_30_features`` order,
+        or anything else indexable by feature name with a length, such as a
+        ``Population``. Missing columns and non-numbers become NaN.
+        """
+        if isinstance(frame, np.ndarray):
+            values = np.asarray(frame, dtype=np.float64)
+            if values.ndim != 2 or values.shape[1] != len(top_30_features):
+                raise ValueError(
+                    f"expected a 2-D array with {len(top_30_features)} columns, got shape {values.shape}"
+                )
+            return values, np.zeros(values.shape, dtype=bool)
+
+        n = len(frame)
+        values = np.full((n, len(top_30_features)), np.nan)
+        not_numeric = np.zeros(values.shape, dtype=bool)
+        for j, feature in enumerate(top_30_features):
+            if feature not in frame:
+                continue
+            column = frame[feature]
+            if hasattr(column, "to_numpy"):
+                column = column.to_numpy()
+            column = np.asarray(column)
+            if column.dtype.kind in "fiub":
+                values[:, j] = column
+                continue
+            import pandas as pd
+
+            numeric = pd.to_numeric(pd.Series(column), errors="coerce").to_numpy(dtype=np.float64)
+            values[:, j] = numeric
+            not_numeric[:, j] = np.isnan(numeric) & pd.notna(column)
+        return values, not_numeric
+
+    def validate(self, frame, allow_missing=True):
+        """Check every row of ``frame`` and return a ``ValidationResult``."""
+        return self.check(*self.matrix(frame), allow_missing=allow_missing)
+
+    def check(self, values, not_numeric, allow_missing=True):
+        """``validate`` for a matrix and type-error mask already returned by ``matrix``."""
+        nan = np.isnan(values)
+        missing = nan & ~not_numeric
+        with np.errstate(invalid="ignore"):
+            out_of_range = (values < self.mins) | (values > self.maxs)
+            not_integer = self.integer & ~nan & (values != np.floor(values)) & ~out_of_range
+
+        # Cross-field rules see the values that will be scored
+        filled = np.where(nan, self.defaults, values)
+        inconsistent = np.zeros((len(values), len(self.cross_field)), dtype=bool)
+        for k, (i, op, j) in enumerate(self.cross_field):
+            inconsistent[:, k] = ~op(filled[:, i], filled[:, j])
+
+        bad = not_numeric | out_of_range | not_integer
+        if not allow_missing:
+            bad |= missing
+        valid = ~bad.any(axis=1) & ~inconsistent.any(axis=1)
+        return ValidationResult(valid, not_numeric, missing, out_of_range, not_integer, inconsistent,
+                                allow_missing)
+
+    def clamp(self, frame):
+        """Repair ``frame`` into an ``(n, 30)`` array that passes the per-feature checks.
+
+        Missing and non-numeric values take their defaults, count features
+        are rounded, and everything is clipped into range.
+        Cross-field rules are not repaired; there is no single right fix.
+        """
+        values, _ = self.matrix(frame)
+        values = np.where(np.isnan(values), self.defaults, values)
+        values[:, self.integer] = np.round(values[:, self.integer])
+        return np.clip(values, self.mins, self.maxs, out=values)
+
+
+VALIDATOR = Validator()
+
+
+def validate(frame, allow_missing=True):
+    return VALIDATOR.validate(frame, allow_missing)
+
+
+def parse_records(records, indexed=True):
+    """``(values, errors)`` for a list of JSON applicant objects.
+
+    ``values`` is the ``(n, 30)`` matrix, NaN where a feature was left out;
+    ``errors`` lists the problems that stop a value from being read at all
+    (not an object, unknown features, values that aren't numbers), each with
+    the record's ``index`` if ``indexed``. Pass ``values`` to ``validate``
+    for the rest.
+    """
+    values = np.full((len(records), len(top_30_features)), np.nan)
+    errors = []
+    for i, record in enumerate(records):
+        where = {"index": i} if indexed else {}
+        if not isinstance(record, dict):
+            errors.append(dict(where, error="applicant must be a JSON object"))
+            continue
+        for feature, value in record.items():
+            j = feature_index.get(feature)
+            number = _number(value)
+            if j is None:
+                errors.append(dict(where, feature=feature, error="unknown feature"))
+            elif number is None:
+                errors.append(dict(where, feature=feature, error="value must be a number"))
+            else:
+                values[i, j] = number
+    return values, errors
+
+
+def _number(value):
+    # A finite float, or None; JSON integers can be too large for a float
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    try:
+        value = float(value)
+    except OverflowError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def validate_applicant(feature_values):
+    """Error dicts (``feature``, ``error``) for one ``Applicant`` or feature dict."""
+    if isinstance(feature_values, Applicant):
+        row = feature_values.values[np.newaxis, :]
+    else:
+        row = np.array([[feature_values.get(feature, np.nan) for feature in top_30_features]], dtype=np.float64)
+    return VALIDATOR.validate(row).errors(indexed=False)